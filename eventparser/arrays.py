@@ -0,0 +1,258 @@
+"""
+This module contains functions relating to parsing eventalign files
+directly into in-memory arrays, for consumers that want events in
+NumPy or pandas rather than in an HDF5 file.
+
+Rows are streamed into typed arrays that grow geometrically, without
+creating a Read or Event object per read or event.  Rows of events that
+are split across several rows are then combined in a vectorised pass.
+"""
+import numpy as np
+
+INITIAL_CAPACITY = 1 << 12
+CHUNK_SIZE = 1 << 10
+CATEGORICAL_COLUMNS = ["contig", "read_name", "ref_kmer"]
+FEATURE_COLUMNS = ["n_samples", "dwell_time", "level_mean", "level_stdv",
+    "model_mean", "model_stdv", "standardized_level"]
+
+_COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+class GrowableArray:
+    """A typed array that is appended to one value at a time, doubling
+    its capacity whenever it is full.  Values are staged in a short
+    list and copied into the array a chunk at a time, since assigning
+    single NumPy elements is several times slower than list appends.
+
+    Args:
+        dtype (numpy.dtype): Type of the values.
+        capacity (int): Initial capacity.
+    """
+    def __init__(self, dtype, capacity=INITIAL_CAPACITY):
+        self.__data = np.empty(capacity, dtype=dtype)
+        self.__size = 0
+        self.__pending = []
+
+    def __len__(self):
+        return self.__size + len(self.__pending)
+
+    def append(self, value):
+        self.__pending.append(value)
+        if len(self.__pending) == CHUNK_SIZE:
+            self.__flush()
+
+    def to_array(self):
+        """Returns the appended values (trimmed to size)."""
+        self.__flush()
+        return self.__data[:self.__size]
+
+    def __flush(self):
+        size = self.__size + len(self.__pending)
+        if size > len(self.__data):
+            capacity = len(self.__data)
+            while capacity < size:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=self.__data.dtype)
+            grown[:self.__size] = self.__data[:self.__size]
+            self.__data = grown
+        self.__data[self.__size:size] = self.__pending
+        self.__size = size
+        self.__pending = []
+
+class Categories:
+    """Assigns an integer code to each distinct string, in order of
+    first appearance.
+
+    Attributes:
+        values ([str]): Category of each code.
+    """
+    def __init__(self):
+        self.values = []
+        self.__codes = {}
+
+    def code(self, value):
+        code = self.__codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.__codes[value] = code
+            self.values.append(value)
+        return code
+
+class EventArrays:
+    """Events of an eventalign file as a table of typed columns, one
+    row per event.
+
+    Args & Attributes:
+        columns ({str: numpy.ndarray}): Column arrays.  Categorical
+            columns (CATEGORICAL_COLUMNS) hold int32 codes.
+        categories ({str: [str]}): Category of each code, per
+            categorical column.
+    """
+    def __init__(self, columns, categories):
+        self.columns = columns
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.columns["position"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def decode(self, name):
+        """Returns a categorical column as an array of strings."""
+        return np.asarray(self.categories[name], dtype=object)[self[name]]
+
+def is_valid_row(position, ref_kmer, model_kmer, start_idx, end_idx):
+    """Returns whether a row's data is valid.  This applies the same
+    rules as eventalign.Line.is_valid, without creating any objects.
+    """
+    if position < 0 or end_idx <= start_idx or start_idx < 0:
+        return False
+    if not ref_kmer or ref_kmer.strip("ACGT") or model_kmer.strip("ACGT"):
+        return False
+    return ref_kmer == model_kmer or \
+        model_kmer == ref_kmer.translate(_COMPLEMENT)[::-1]
+
+def parse_to_arrays(eventalign, features=False):
+    """Parses an eventalign file into an EventArrays.
+
+    Events split across several rows are combined as by
+    EventalignReadParser: start_idx is taken from the last row and
+    end_idx from the first, and (with features=True) means are weighted
+    by each row's number of samples and standard deviations pooled.
+    Unlike EventalignReadParser, the first row of the file is also
+    checked for validity.
+
+    Args:
+        eventalign (str or file object): Eventalign file (or path).
+        features (bool): Whether to include FEATURE_COLUMNS.
+
+    Returns:
+        EventArrays
+    """
+    if isinstance(eventalign, str):
+        with open(eventalign) as in_file:
+            return parse_to_arrays(in_file, features)
+    categories = {name: Categories() for name in CATEGORICAL_COLUMNS}
+    rows = {
+        "position": GrowableArray(np.int64),
+        "start_idx": GrowableArray(np.int64),
+        "end_idx": GrowableArray(np.int64),
+        "contig": GrowableArray(np.int32),
+        "read_name": GrowableArray(np.int32),
+        "ref_kmer": GrowableArray(np.int32),
+        "new_event": GrowableArray(np.bool_),
+    }
+    float_rows = []
+    if features:
+        for name, column in (("level_mean", 6), ("level_stdv", 7),
+            ("dwell_time", 8), ("model_mean", 10), ("model_stdv", 11),
+            ("standardized_level", 12)):
+            rows[name] = GrowableArray(np.float64)
+            float_rows.append((rows[name], column))
+    contigs = categories["contig"]
+    read_names = categories["read_name"]
+    kmers = categories["ref_kmer"]
+    position_rows = rows["position"]
+    start_rows = rows["start_idx"]
+    end_rows = rows["end_idx"]
+    contig_rows = rows["contig"]
+    read_rows = rows["read_name"]
+    kmer_rows = rows["ref_kmer"]
+    new_event_rows = rows["new_event"]
+
+    next(eventalign, None) # header (empty files have no rows either)
+    last_read_name = None
+    last_position = None
+    for line in eventalign:
+        # Eventalign is unquoted, and the samples column is not needed
+        line = line.split("\t", 15)
+        position = int(line[1])
+        start_idx = int(line[13])
+        end_idx = int(line[14])
+        if not is_valid_row(position, line[2], line[9], start_idx, end_idx):
+            continue
+        read_name = line[3]
+        new_event_rows.append(read_name != last_read_name or
+            position != last_position)
+        last_read_name = read_name
+        last_position = position
+        position_rows.append(position)
+        start_rows.append(start_idx)
+        end_rows.append(end_idx)
+        contig_rows.append(contigs.code(line[0]))
+        read_rows.append(read_names.code(read_name))
+        kmer_rows.append(kmers.code(line[2]))
+        for array, column in float_rows:
+            array.append(float(line[column]))
+
+    columns = _combine_rows({name: array.to_array()
+        for name, array in rows.items()}, features)
+    return EventArrays(columns, {name: categories[name].values
+        for name in CATEGORICAL_COLUMNS})
+
+def _combine_rows(rows, features):
+    """Combines the rows of each event into one, given per-row columns
+    and a "new_event" column flagging each event's first row.
+    """
+    first = np.flatnonzero(rows["new_event"])
+    if len(first) == 0: # No valid rows
+        names = ["contig", "read_name", "position", "ref_kmer", "start_idx",
+            "end_idx"]
+        columns = {name: rows[name][:0] for name in names}
+        if features:
+            columns.update((name, np.empty(0, dtype=np.float64))
+                for name in FEATURE_COLUMNS)
+            columns["n_samples"] = rows["end_idx"][:0]
+        return columns
+    last = np.append(first[1:], len(rows["new_event"])) - 1
+    columns = {}
+    for name in ["contig", "read_name", "position", "ref_kmer"]:
+        columns[name] = rows[name][first]
+    # Assumes eventalign contains RNA, which has events in reverse order
+    columns["start_idx"] = rows["start_idx"][last]
+    columns["end_idx"] = rows["end_idx"][first]
+    if not features:
+        return columns
+
+    def event_sum(values):
+        return np.add.reduceat(values, first)
+
+    n = rows["end_idx"] - rows["start_idx"]
+    n_samples = event_sum(n)
+    weight = n / np.repeat(n_samples, last - first + 1)
+    level_mean = event_sum(rows["level_mean"] * weight)
+    mean_sq = event_sum(
+        (rows["level_stdv"] ** 2 + rows["level_mean"] ** 2) * weight)
+    columns["n_samples"] = n_samples
+    columns["dwell_time"] = event_sum(rows["dwell_time"])
+    columns["level_mean"] = level_mean
+    columns["level_stdv"] = np.sqrt(np.maximum(mean_sq - level_mean ** 2, 0))
+    columns["model_mean"] = rows["model_mean"][first]
+    columns["model_stdv"] = rows["model_stdv"][first]
+    columns["standardized_level"] = event_sum(
+        rows["standardized_level"] * weight)
+    return columns
+
+def parse_to_frame(eventalign, features=False):
+    """Parses an eventalign file into a pandas DataFrame with one row
+    per event.  Contig, read name and k-mer columns are categorical.
+
+    Args:
+        eventalign (str or file object): Eventalign file (or path).
+        features (bool): Whether to include FEATURE_COLUMNS.
+
+    Returns:
+        pandas.DataFrame
+
+    Raises:
+        ImportError: If pandas is not installed.
+    """
+    import pandas as pd
+    arrays = parse_to_arrays(eventalign, features)
+    data = {}
+    for name, column in arrays.columns.items():
+        if name in arrays.categories:
+            column = pd.Categorical.from_codes(column,
+                categories=arrays.categories[name])
+        data[name] = column
+    return pd.DataFrame(data)
@@ -0,0 +1,159 @@
+"""
+This module contains classes relating to caching conversions, so that
+re-running a conversion on an unchanged input reuses the existing
+output instead of regenerating it.
+
+A conversion is identified by a cache key derived from a fingerprint of
+the input file's content, the parser's options and the package
+version.  The key is stored both in the output file's metadata and in
+a local cache directory that maps keys to previously written outputs.
+"""
+import hashlib
+import json
+import os
+import shutil
+from . import __version__
+
+CACHE_KEY_ATTR = "eventparser_cache_key"
+BLOCK_SIZE = 1 << 16
+N_SAMPLED_BLOCKS = 16
+
+def default_cache_dir():
+    """Returns $EVENTPARSER_CACHE_DIR, or ~/.cache/eventparser."""
+    return os.environ.get("EVENTPARSER_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "eventparser"))
+
+def fingerprint(filepath, full=False):
+    """Returns a fingerprint of a file's content.
+
+    By default only the file size and N_SAMPLED_BLOCKS evenly spaced
+    blocks (always including the first and last) are hashed, so large
+    files are fingerprinted in constant time.  This may miss an edit
+    that changes neither the size nor any sampled block; use full=True
+    to hash the whole file.
+
+    Args:
+        filepath (str): File to fingerprint.
+        full (bool): Whether to hash the whole file.
+
+    Returns:
+        str: Hex digest.
+    """
+    size = os.path.getsize(filepath)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update("{0}:{1}:".format("full" if full else "sampled",
+        size).encode())
+    with open(filepath, "rb") as f:
+        if full or size <= BLOCK_SIZE * N_SAMPLED_BLOCKS:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                digest.update(block)
+        else:
+            step = (size - BLOCK_SIZE) // (N_SAMPLED_BLOCKS - 1)
+            for i in range(N_SAMPLED_BLOCKS):
+                f.seek(i * step)
+                digest.update(f.read(BLOCK_SIZE))
+    return digest.hexdigest()
+
+def cache_key(filepath, options, full=False):
+    """Returns the cache key of converting a file with given options.
+
+    Args:
+        filepath (str): Input file.
+        options (dict): JSON-serialisable parser options.
+        full (bool): Whether to hash the whole input file.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(fingerprint(filepath, full).encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    digest.update(__version__.encode())
+    return digest.hexdigest()
+
+class ConversionCache:
+    """Maps cache keys to previously written output files.
+
+    Each entry is a small JSON file named after its key in cache_dir.
+    An entry is only trusted if the output it points to still carries
+    the same key in its metadata, so outputs that were since
+    overwritten or deleted are never reused.
+
+    Args & Attributes:
+        cache_dir (str): Directory holding cache entries.
+        full_hash (bool): Whether to hash whole input files rather than
+            sampled blocks.
+        hits (int): Number of conversions skipped by this cache.
+        misses (int): Number of conversions not found in this cache.
+    """
+    def __init__(self, cache_dir=None, full_hash=False):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.full_hash = full_hash
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, filepath, options):
+        """Returns the cache key of converting filepath with options."""
+        return cache_key(filepath, options, self.full_hash)
+
+    def reuse(self, key, out_filepath, writer):
+        """Makes out_filepath hold the output for key if it is cached.
+
+        If out_filepath already holds that output it is left as is.
+        Otherwise, if a cached output exists elsewhere, it is
+        hard-linked (or copied, if linking fails) to out_filepath.
+
+        Args:
+            key (str): Cache key of the conversion.
+            out_filepath (str): Where the output should be.
+            writer (IEventWriter): Writer of the output format.
+
+        Returns:
+            bool: Whether out_filepath now holds the cached output.
+        """
+        if self.__holds(out_filepath, key, writer):
+            self.hits += 1
+            return True
+        cached_filepath = self.__lookup(key)
+        if cached_filepath is not None and \
+                self.__holds(cached_filepath, key, writer):
+            tmp_filepath = out_filepath + ".tmp"
+            try:
+                os.link(cached_filepath, tmp_filepath)
+            except OSError:
+                shutil.copyfile(cached_filepath, tmp_filepath)
+            os.replace(tmp_filepath, out_filepath)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def store(self, key, out_filepath):
+        """Records that out_filepath holds the output for key.
+
+        Args:
+            key (str): Cache key of the conversion.
+            out_filepath (str): Output file (already tagged with key).
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = {"output": os.path.abspath(out_filepath),
+                 "version": __version__}
+        tmp_path = self.__entry_path(key) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self.__entry_path(key))
+
+    def __lookup(self, key):
+        try:
+            with open(self.__entry_path(key)) as f:
+                return json.load(f)["output"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __holds(self, filepath, key, writer):
+        if not os.path.isfile(filepath):
+            return False
+        return writer.read_metadata(filepath, CACHE_KEY_ATTR) == key
+
+    def __entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
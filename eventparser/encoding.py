@@ -0,0 +1,110 @@
+"""
+This module contains functions relating to compact encodings of event
+data: k-mers packed into integer codes (2 bits per base) and nearly
+monotone integer sequences (positions, signal indices) stored as
+deltas in the smallest integer type that fits.
+"""
+import numpy as np
+
+KMER_ALPHABET = "ACGT"
+MAX_PACKED_KMER_LENGTH = 32
+
+_BASE_CODES = np.full(256, -1, dtype=np.int16)
+for _code, _base in enumerate(KMER_ALPHABET):
+    _BASE_CODES[ord(_base)] = _code
+
+def kmer_code_dtype(k):
+    """Returns the smallest unsigned integer type that holds a packed
+    k-mer of length k.
+
+    Raises:
+        ValueError: If k is longer than MAX_PACKED_KMER_LENGTH.
+    """
+    if k > MAX_PACKED_KMER_LENGTH:
+        raise ValueError("Cannot pack {0}-mers".format(k))
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if 2 * k <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+
+def pack_kmers(kmers):
+    """Packs k-mers into integer codes, 2 bits per base, with the first
+    base in the most significant bits.
+
+    Args:
+        kmers ([str]): K-mers of equal length over KMER_ALPHABET.
+
+    Returns:
+        numpy.ndarray: Codes, of type kmer_code_dtype(k).
+
+    Raises:
+        ValueError: If the k-mers differ in length or contain a base
+            not in KMER_ALPHABET.
+    """
+    k = len(kmers[0]) if kmers else 0
+    dtype = kmer_code_dtype(k)
+    if any(len(kmer) != k for kmer in kmers):
+        raise ValueError("K-mers must all have the same length")
+    joined = "".join(kmers).encode("ascii")
+    bases = _BASE_CODES[np.frombuffer(joined, dtype=np.uint8)]
+    if (bases < 0).any():
+        raise ValueError("K-mers may only contain " + KMER_ALPHABET)
+    bases = bases.astype(np.uint64).reshape(len(kmers), k)
+    shifts = np.arange(2 * (k - 1), -1, -2, dtype=np.uint64)
+    codes = (bases << shifts).sum(axis=1, dtype=np.uint64)
+    return codes.astype(dtype)
+
+def unpack_kmers(codes, k):
+    """Unpacks integer codes created by pack_kmers into k-mers.
+
+    Args:
+        codes (numpy.ndarray): Packed k-mers.
+        k (int): Length of the k-mers.
+
+    Returns:
+        [str]
+    """
+    codes = np.asarray(codes, dtype=np.uint64)
+    shifts = np.arange(2 * (k - 1), -1, -2, dtype=np.uint64)
+    bases = (codes[:, np.newaxis] >> shifts) & np.uint64(3)
+    alphabet = np.frombuffer(KMER_ALPHABET.encode("ascii"), dtype=np.uint8)
+    chars = alphabet[bases.astype(np.intp)]
+    return [row.tobytes().decode("ascii") for row in chars]
+
+def int_dtype(values, signed=True):
+    """Returns the smallest integer type that holds all values."""
+    values = np.asarray(values)
+    low = int(values.min()) if values.size else 0
+    high = int(values.max()) if values.size else 0
+    dtypes = (np.int8, np.int16, np.int32, np.int64) if signed else \
+        (np.uint8, np.uint16, np.uint32, np.uint64)
+    for dtype in dtypes:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    raise ValueError("Values do not fit in 64 bits")
+
+def delta_encode(values):
+    """Delta-encodes a sequence of integers.
+
+    Args:
+        values ([int]): Integers to encode.
+
+    Returns:
+        (int, numpy.ndarray): The first value, and the difference
+            between each value and the previous one (the first
+            difference being 0), in the smallest integer type that
+            holds them.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if values.size == 0:
+        return 0, np.zeros(0, dtype=np.int8)
+    deltas = np.diff(values, prepend=values[0])
+    return int(values[0]), deltas.astype(int_dtype(deltas))
+
+def delta_decode(first, deltas):
+    """Decodes integers encoded by delta_encode.
+
+    Returns:
+        numpy.ndarray: Decoded integers, as int64.
+    """
+    return first + np.cumsum(deltas, dtype=np.int64)
@@ -2,16 +2,28 @@
 This module contains classes relating to Nanopolish eventalign files.
 """
 import csv
-import h5py
-import re
-from abc import ABC, abstractmethod
-from .ont import Read, Event, Kmer
+from .ont import Read, Event, EventStatistics, Kmer
 from .parser import IReadParser
 
 class EventalignReadParser(IReadParser):
     """Parses an eventalign file read by read.
+
+    Args & Attributes:
+        features (bool): Whether to compute the features of each event 
+            (see features.read_features) and attach them to each Read.
+        keep_samples (bool): Whether to keep the current samples of 
+            each event.  Requires an eventalign file generated with 
+            nanopolish's --samples option.
     """
-    def parse_reads(self, in_file):
+    def __init__(self, features=False, keep_samples=False):
+        self.features = features
+        self.keep_samples = keep_samples
+
+    def options(self):
+        return {"features": self.features, 
+                "keep_samples": self.keep_samples}
+
+    def parse_reads(self, in_file, accept=None):
         """Yields each read in an eventalign file object.
         
         Note: In an eventalign file, a single event may be split across 
@@ -20,40 +32,92 @@ class EventalignReadParser(IReadParser):
         this case, the data from all rows containing the event must be 
         combined, preserving the order of current measurements.
 
+        A read is only yielded once the next read starts (or the file
+        ends), so when in_file is a follow.FollowFile over a file that
+        is still being written, partially written reads are never 
+        yielded.  For the same reason, the last read is not yielded if
+        the FollowFile is truncated.
+
         Arguments:
             in_file (file object): Eventalign file object to parse.
+            accept (function): If given, called with the name, contig 
+                and first position of each read.  Reads for which it 
+                returns False are skipped without parsing their events.
+
+        Raises:
+            ValueError: If samples are kept but in_file has no samples
+                column.
         """
         reader = csv.reader(in_file, delimiter="\t")
         next(reader) # header
+        read = None
+        skipped_name = None
         line = self.__parse_line(next(reader))
-        read = Read(line.read_name, line.contig)
-        event = Event(line.position, line.ref_kmer, line.start_idx, 
-            line.end_idx)
+        if accept is None or accept(line.read_name, line.contig, 
+            line.position):
+            read = Read(line.read_name, line.contig)
+            event = self.__new_event(line)
+        else:
+            skipped_name = line.read_name
         for line in reader:
+            if line[3] == skipped_name:
+                continue
             line = self.__parse_line(line)
             if line.is_valid() == False:
                 continue
-            if line.read_name == read.name:
+            if read is not None and line.read_name == read.name:
                 if line.position == event.position:
-                    # event.add_samples(line.samples)
-                    # Assumes eventalign contains RNA, which has events 
-                    # in reverse order
-                    event.start_idx = line.start_idx 
+                    self.__extend_event(event, line)
                 else:
                     read.add_event(event)
-                    event = Event(line.position, line.ref_kmer, 
-                        line.start_idx, line.end_idx)
+                    event = self.__new_event(line)
             else:
-                read.add_event(event)
-                yield read
-                read = Read(line.read_name, line.contig)
-                event = Event(line.position, line.ref_kmer, 
-                    line.start_idx, line.end_idx)
-        read.add_event(event)
-        yield read
+                if read is not None:
+                    read.add_event(event)
+                    yield self.__finish_read(read)
+                    read = None
+                skipped_name = None
+                if accept is None or accept(line.read_name, line.contig, 
+                    line.position):
+                    read = Read(line.read_name, line.contig)
+                    event = self.__new_event(line)
+                else:
+                    skipped_name = line.read_name
+        if read is not None and not getattr(in_file, "truncated", False):
+            read.add_event(event)
+            yield self.__finish_read(read)
+
+    def __new_event(self, line):
+        event = Event(line.position, line.ref_kmer, line.start_idx, 
+            line.end_idx)
+        if self.keep_samples:
+            event.samples = list(line.samples)
+        if self.features:
+            event.stats = EventStatistics(line.end_idx - line.start_idx,
+                line.level_mean, line.level_stdv, line.dwell_time, 
+                line.model_mean, line.model_stdv, line.standardized_level)
+        return event
+
+    def __extend_event(self, event, line):
+        # Assumes eventalign contains RNA, which has events in reverse
+        # order, so each row's samples precede those of earlier rows
+        event.start_idx = line.start_idx
+        if self.keep_samples:
+            event.add_samples(line.samples, before=True)
+        if self.features:
+            event.stats.add(line.end_idx - line.start_idx, 
+                line.level_mean, line.level_stdv, line.dwell_time, 
+                line.standardized_level)
+
+    def __finish_read(self, read):
+        if self.features:
+            from .features import read_features
+            read.features = read_features(read)
+        return read
 
     def __parse_line(self, line):
-        """Parses one line in an eventalign file.
+        """Parses one line in an eventalign file.  Event statistics and
+        samples are only parsed if they are needed.
 
         Args:
             line ([]): Tab-separated line in an eventalign file.
@@ -68,9 +132,21 @@ class EventalignReadParser(IReadParser):
         model_kmer = line[9]
         start_idx = int(line[13])
         end_idx = int(line[14])
-        # samples = [float(x) for x in line[15].split(',')]
-        return Line(contig, position, read_name, ref_kmer, model_kmer, 
+        parsed = Line(contig, position, read_name, ref_kmer, model_kmer, 
             start_idx, end_idx)
+        if self.features:
+            parsed.level_mean = float(line[6])
+            parsed.level_stdv = float(line[7])
+            parsed.dwell_time = float(line[8])
+            parsed.model_mean = float(line[10])
+            parsed.model_stdv = float(line[11])
+            parsed.standardized_level = float(line[12])
+        if self.keep_samples:
+            if len(line) < 16:
+                raise ValueError("Eventalign file has no samples column "
+                    "(run nanopolish eventalign with --samples)")
+            parsed.samples = [float(x) for x in line[15].split(',')]
+        return parsed
 
 class Line:
     """Represents one line in a Nanopolish eventalign file.
@@ -82,7 +158,19 @@ class Line:
         read_name (str): Name of the nanopore read.
         ref_kmer (str): Reference k-mer.
         model_kmer (str): Model k-mer.
+        start_idx (int): Start index of the row in the raw signal.
+        end_idx (int): End index of the row in the raw signal.
+
+    Attributes:
+        level_mean (float): Mean current of the row.
+        level_stdv (float): Standard deviation of the current.
+        dwell_time (float): Duration (s) of the row.
+        model_mean (float): Expected mean current of the model k-mer.
+        model_stdv (float): Expected standard deviation of the current.
+        standardized_level (float): Standardized current of the row.
         samples ([float]): List of current measurements.
+
+        These are None unless set by the parser.
     """
     def __init__(self, contig, position, read_name, ref_kmer, 
         model_kmer, start_idx, end_idx):
@@ -93,7 +181,13 @@ class Line:
         self.model_kmer = Kmer(model_kmer)
         self.start_idx = start_idx
         self.end_idx = end_idx
-        # self.samples = samples
+        self.level_mean = None
+        self.level_stdv = None
+        self.dwell_time = None
+        self.model_mean = None
+        self.model_stdv = None
+        self.standardized_level = None
+        self.samples = None
 
     def is_valid(self):
         """Determines whether this line's data is valid.  There are
@@ -121,6 +215,6 @@ class Line:
                self.start_idx >= 0
 
 class TomboReadParser(IReadParser):
-    def parse_reads(self, stream):
+    def parse_reads(self, stream, accept=None):
         # TODO
         pass
\ No newline at end of file
@@ -1,36 +1,161 @@
 """
-This module contains classes relating to the creation of an 
+This module contains classes relating to the creation of an
 AlignedEventParser. Since each type of event alignment software
 generates a different file type, a different internal parser is used
-for each file type.
+for each file type.  Likewise, each output format has its own writer.
+
+Parser and writer backends are held in registries and are only
+imported when selected, so that a process which never writes HDF5 (e.g.
+a dry-run) never imports h5py.  Third-party backends can be added
+through the "eventparser.read_parsers" and "eventparser.writers" entry
+point groups, e.g. in setup.py:
+
+    entry_points={
+        "eventparser.read_parsers": ["mytool = mypkg.mymod:MyReadParser"],
+    }
 """
+import importlib
 from enum import Enum
-from .eventalign import EventalignReadParser, TomboReadParser
 from .parser import AlignedEventParser
 
+READ_PARSER_ENTRY_POINT_GROUP = "eventparser.read_parsers"
+WRITER_ENTRY_POINT_GROUP = "eventparser.writers"
+
 class AlignedEventType(Enum):
     """There are currently two tools that generate aligned event files,
     each of which have their own file type:
         1) Nanopolish (https://github.com/jts/nanopolish/)
         2) Tombo (https://github.com/nanoporetech/tombo/)
+
+    The value of each member is the name of its read parser backend.
     """
-    NANOPOLISH_EVENTALIGN = 1
-    TOMBO_FAST5 = 2
+    NANOPOLISH_EVENTALIGN = "eventalign"
+    TOMBO_FAST5 = "tombo"
 
-class AlignedEventParserFactory:
-    """Responsible for creating an AlignedEventParser with the correct 
-    type of ReadParser, which depends on the aligned event file type.
+class BackendRegistry:
+    """Maps backend names to classes that are imported lazily.
+
+    Built-in backends are registered as "module:attribute" strings and
+    are imported on first use.  Entry points in entry_point_group are
+    only scanned if a name is not registered, since scanning installed
+    package metadata costs more than importing a built-in backend, and
+    are loaded with EntryPoint.load().  Registered backends take
+    precedence over entry points of the same name.
 
     Args:
-        event_type (AlignedEventType): Aligned event file type.
-    
-    Returns:
-        AlignedEventParser
+        entry_point_group (str): Entry point group to search for
+            third-party backends.
     """
-    def create(self, event_type):
-        if event_type == AlignedEventType.NANOPOLISH_EVENTALIGN:
-            return AlignedEventParser(EventalignReadParser())
-        elif event_type == AlignedEventType.TOMBO_FAST5:
-            return AlignedEventParser(TomboReadParser())
+    def __init__(self, entry_point_group):
+        self.entry_point_group = entry_point_group
+        self.__targets = {}
+        self.__entry_points = {}
+        self.__loaded = {}
+        self.__discovered = False
+
+    def register(self, name, target):
+        """Registers a backend.
+
+        Args:
+            name (str): Name used to select the backend.
+            target (str or type): Either a "module:attribute" string,
+                which is imported on first use, or the class itself.
+        """
+        self.__targets[name] = target
+        self.__loaded.pop(name, None)
+
+    def names(self):
+        """Returns the names of all available backends, including those
+        provided by entry points.
+        """
+        self.__discover()
+        return sorted(set(self.__targets) | set(self.__entry_points))
+
+    def load(self, name):
+        """Returns the backend class registered under name, importing
+        it if necessary.
+
+        Args:
+            name (str): Name of the backend.
+
+        Raises:
+            ValueError: If no backend is registered under name.
+        """
+        if name in self.__loaded:
+            return self.__loaded[name]
+        if name not in self.__targets:
+            self.__discover()
+        if name in self.__targets:
+            target = self.__targets[name]
+            if isinstance(target, str):
+                module_name, _, attr = target.partition(":")
+                target = getattr(importlib.import_module(module_name), attr)
+        elif name in self.__entry_points:
+            target = self.__entry_points[name].load()
         else:
-            raise ValueError(event_type)
\ No newline at end of file
+            raise ValueError(name)
+        self.__loaded[name] = target
+        return target
+
+    def __discover(self):
+        if self.__discovered:
+            return
+        self.__discovered = True
+        for entry_point in _entry_points(self.entry_point_group):
+            self.__entry_points.setdefault(entry_point.name, entry_point)
+
+def _entry_points(group):
+    """Returns the installed entry points in group (empty if entry
+    point metadata is unavailable).
+    """
+    try:
+        from importlib import metadata
+    except ImportError: # Python < 3.8
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            return []
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))
+
+read_parsers = BackendRegistry(READ_PARSER_ENTRY_POINT_GROUP)
+read_parsers.register("eventalign", "eventparser.eventalign:EventalignReadParser")
+read_parsers.register("tombo", "eventparser.eventalign:TomboReadParser")
+
+writers = BackendRegistry(WRITER_ENTRY_POINT_GROUP)
+writers.register("hdf5", "eventparser.h5:H5EventWriter")
+writers.register("hdf5-compact", "eventparser.h5:CompactH5EventWriter")
+
+class AlignedEventParserFactory:
+    """Responsible for creating an AlignedEventParser with the correct
+    type of ReadParser, which depends on the aligned event file type,
+    and the correct type of writer, which depends on the output format.
+    """
+    def create(self, event_type, writer="hdf5", sampler=None,
+        signal_attacher=None, **read_parser_options):
+        """Creates an AlignedEventParser.
+
+        Args:
+            event_type (AlignedEventType or str): Aligned event file
+                type, or the name of a registered read parser.
+            writer (str): Name of a registered writer.
+            sampler (CoverageSampler): If given, only the reads it
+                samples are written.
+            signal_attacher (SignalAttacher): If given, attaches raw
+                signal to each event.
+            **read_parser_options: Passed to the read parser, e.g.
+                features=True for EventalignReadParser.
+
+        Returns:
+            AlignedEventParser
+
+        Raises:
+            ValueError: If event_type or writer is not registered.
+        """
+        if isinstance(event_type, AlignedEventType):
+            event_type = event_type.value
+        read_parser = read_parsers.load(event_type)(**read_parser_options)
+        return AlignedEventParser(read_parser, writers.load(writer)(), 
+            sampler, signal_attacher)
@@ -0,0 +1,184 @@
+"""
+This module contains classes relating to Oxford Nanopore Technologies'
+FAST5 files, which hold the raw current signal of each read.  Events
+hold the indices of their samples in this signal (start_idx, end_idx),
+which are used here to attach each event's slice of the signal.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+import h5py
+import numpy as np
+
+class Fast5Index:
+    """Maps read names to the FAST5 files in a directory (searched
+    recursively) that hold their signal.  Both multi-read and
+    single-read FAST5 files are supported.
+
+    Args & Attributes:
+        directory (str): Directory containing FAST5 files.
+        files ({str: str}): Path of the file holding each read.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+        for filepath in fast5_files(directory):
+            with h5py.File(filepath, "r") as fast5:
+                for read_name in read_names(fast5):
+                    self.files[read_name] = filepath
+
+    def __contains__(self, read_name):
+        return read_name in self.files
+
+    def __len__(self):
+        return len(self.files)
+
+def fast5_files(directory):
+    """Yields the path of each FAST5 file in a directory (searched
+    recursively), in a fixed order.
+    """
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".fast5"):
+                yield os.path.join(root, filename)
+
+def files_fingerprint(directory):
+    """Returns a fingerprint of the FAST5 files in a directory, from
+    the path, size and modification time of each file.  Their content
+    is not read.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for filepath in fast5_files(directory):
+        stat = os.stat(filepath)
+        digest.update("{0}:{1}:{2}\n".format(
+            os.path.relpath(filepath, directory), stat.st_size,
+            stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+def read_names(fast5):
+    """Returns the names of the reads in an open FAST5 file."""
+    if "Raw" not in fast5: # multi-read
+        return [name[len("read_"):] for name in fast5
+            if name.startswith("read_")]
+    return [_decode(read.attrs["read_id"])
+        for read in fast5["Raw/Reads"].values()]
+
+def signal_group(fast5, read_name):
+    """Returns the group holding a read's signal ("Signal" dataset) and
+    the group holding its channel calibration attributes.
+    """
+    if "Raw" not in fast5: # multi-read
+        read_group = fast5["read_" + read_name]
+        return read_group["Raw"], read_group["channel_id"]
+    raw = next(iter(fast5["Raw/Reads"].values()))
+    return raw, fast5["UniqueGlobalKey/channel_id"]
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+class SignalAttacher:
+    """Attaches to each event the slice of its read's raw signal
+    between start_idx and end_idx.
+
+    Each read's signal is read once, restricted to the range spanned by
+    its events, and sliced for all of its events in bulk.  Open FAST5
+    files are kept in a pool of at most max_open_files, closing the
+    least recently used file first, so reads stored in the same file
+    do not reopen it.
+
+    Args & Attributes:
+        directory (str): Directory containing FAST5 files.
+        scale (bool): Whether to convert the signal to picoamperes
+            (float32) rather than keeping raw DAC values (int16).
+        max_open_files (int): Maximum number of files kept open.
+
+    Attributes:
+        index (Fast5Index): Built on first use.
+        missing (int): Number of reads not found in any FAST5 file.
+        out_of_range (int): Number of reads with events beyond the end
+            of their signal, which are left as is.
+    """
+    def __init__(self, directory, scale=True, max_open_files=16):
+        self.directory = directory
+        self.scale = scale
+        self.max_open_files = max_open_files
+        self.index = None
+        self.missing = 0
+        self.out_of_range = 0
+        self.__open_files = OrderedDict()
+
+    def options(self):
+        """Returns the options of this attacher, as a
+        JSON-serialisable dict.  These include a fingerprint of the
+        FAST5 files, so that replacing or editing them changes the
+        options.
+        """
+        return {"directory": os.path.abspath(self.directory),
+                "files": files_fingerprint(self.directory),
+                "scale": self.scale}
+
+    def attach_all(self, reads):
+        """Yields each read after attaching signal to its events, and
+        closes all open files once done.
+
+        Args:
+            reads (iterable of Read): Reads to attach signal to.
+        """
+        try:
+            for read in reads:
+                self.attach(read)
+                yield read
+        finally:
+            self.close()
+
+    def attach(self, read):
+        """Sets the signal attribute of each of a read's events.  If
+        the read is not in any FAST5 file, or any of its events ends
+        beyond the end of its signal, its events are left as is.
+
+        Args:
+            read (Read): Read to attach signal to.
+        """
+        if self.index is None:
+            self.index = Fast5Index(self.directory)
+        if read.name not in self.index or not read.events:
+            self.missing += 1
+            return
+        fast5 = self.__open(self.index.files[read.name])
+        raw, channel = signal_group(fast5, read.name)
+        starts = np.array([event.start_idx for event in read.events])
+        ends = np.array([event.end_idx for event in read.events])
+        low = int(starts.min())
+        high = int(ends.max())
+        if high > raw["Signal"].shape[0]:
+            self.out_of_range += 1
+            return
+        signal = raw["Signal"][low:high]
+        if self.scale:
+            attrs = channel.attrs
+            signal = ((signal + np.float32(attrs["offset"])) *
+                np.float32(attrs["range"] / attrs["digitisation"])
+                ).astype(np.float32)
+        for event, start, end in zip(read.events, starts - low, ends - low):
+            event.signal = signal[start:end]
+
+    def close(self):
+        """Closes all open files."""
+        while self.__open_files:
+            _, fast5 = self.__open_files.popitem()
+            fast5.close()
+
+    def __open(self, filepath):
+        if filepath in self.__open_files:
+            self.__open_files.move_to_end(filepath)
+            return self.__open_files[filepath]
+        if len(self.__open_files) >= self.max_open_files:
+            _, fast5 = self.__open_files.popitem(last=False)
+            fast5.close()
+        fast5 = h5py.File(filepath, "r")
+        self.__open_files[filepath] = fast5
+        return fast5
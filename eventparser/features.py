@@ -0,0 +1,84 @@
+"""
+This module contains functions relating to computing per-event signal
+features, so that downstream consumers can read them directly rather
+than recomputing them from samples.  It is only imported when features
+are requested, so that numpy is not loaded otherwise.
+"""
+import numpy as np
+
+FEATURE_DTYPE = np.dtype([
+    ("position", np.int64),
+    ("start_idx", np.int64),
+    ("end_idx", np.int64),
+    ("n_samples", np.int64),
+    ("dwell_time", np.float64),
+    ("level_mean", np.float64),
+    ("level_stdv", np.float64),
+    ("model_mean", np.float64),
+    ("model_stdv", np.float64),
+    ("standardized_level", np.float64),
+    ("median", np.float64),
+    ("mad", np.float64),
+])
+
+BATCH_SIZE = 4096
+
+def read_features(read, batch_size=BATCH_SIZE):
+    """Returns the features of every event in a read.
+
+    Summary statistics are taken from each event's EventStatistics.
+    The median and median absolute deviation (MAD) of the current are
+    only computed for events that have samples, and are NaN otherwise.
+
+    Args:
+        read (Read): Read whose events have statistics.
+        batch_size (int): Maximum number of events whose samples are
+            processed together.
+
+    Returns:
+        numpy.ndarray: One FEATURE_DTYPE record per event.
+    """
+    features = np.zeros(len(read.events), dtype=FEATURE_DTYPE)
+    for i, event in enumerate(read.events):
+        stats = event.stats
+        features[i] = (event.position, event.start_idx, event.end_idx,
+            stats.n_samples, stats.dwell_time, stats.level_mean,
+            stats.level_stdv, stats.model_mean, stats.model_stdv,
+            stats.standardized_level, np.nan, np.nan)
+    samples = [event.samples or [] for event in read.events]
+    median, mad = sample_features(samples, batch_size)
+    features["median"] = median
+    features["mad"] = mad
+    return features
+
+def sample_features(samples, batch_size=BATCH_SIZE):
+    """Returns the median and MAD of each list of samples.
+
+    Events are sorted by number of samples and processed in batches,
+    each batch padded with NaN into a 2D array, so that padding is kept
+    small even when a few events are very long.
+
+    Args:
+        samples ([[float]]): Samples of each event.
+        batch_size (int): Maximum number of events per batch.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): Median and MAD of each event
+            (NaN for events without samples).
+    """
+    lengths = np.array([len(s) for s in samples], dtype=np.int64)
+    median = np.full(len(samples), np.nan)
+    mad = np.full(len(samples), np.nan)
+    order = np.argsort(lengths, kind="stable")
+    order = order[lengths[order] > 0]
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        width = lengths[batch[-1]]
+        padded = np.full((len(batch), width), np.nan)
+        for row, i in enumerate(batch):
+            padded[row, :lengths[i]] = samples[i]
+        batch_median = np.nanmedian(padded, axis=1)
+        median[batch] = batch_median
+        mad[batch] = np.nanmedian(
+            np.abs(padded - batch_median[:, np.newaxis]), axis=1)
+    return median, mad
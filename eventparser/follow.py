@@ -0,0 +1,134 @@
+"""
+This module contains classes relating to following an aligned event
+file while it is still being written (e.g. by nanopolish eventalign),
+so that conversion can overlap with event alignment.
+"""
+import os
+import time
+
+class FollowFile:
+    """Iterates over the complete lines of a file that is still being
+    written, waiting for more lines whenever it reaches the end of the
+    file, until the file is known to be complete.
+
+    The file is considered complete once finish() has been called, the
+    done_file exists, the producer process has exited, or no data has
+    arrived for idle_timeout seconds.  Any data written before then is
+    still read.  A line without a trailing newline is never returned:
+    it is held back until it is complete, and dropped (see
+    dropped_line) if the file is complete first, as the producer's
+    output may have been cut off mid-line.
+
+    Args & Attributes:
+        filepath (str): File to follow.  It need not exist yet.
+        poll_interval (float): Seconds to wait before checking for new
+            data at the end of the file.
+        done_file (str): If given, the file is complete once this file
+            exists.
+        producer_pid (int): If given, the file is complete once the
+            process with this ID has exited.
+        idle_timeout (float): If given, the file is complete once no
+            data has arrived for this many seconds.
+        on_idle (function): If given, called with no arguments each
+            time the end of the file is reached and more data is
+            awaited.
+
+    Attributes:
+        dropped_line (str): Incomplete last line dropped once the file
+            was complete, or None.
+        truncated (bool): Whether the last record (e.g. the last read)
+            may have been cut off, because the file was complete for a
+            reason other than the producer exiting, or a line was
+            dropped.
+    """
+    def __init__(self, filepath, poll_interval=1.0, done_file=None,
+        producer_pid=None, idle_timeout=None, on_idle=None):
+        self.filepath = filepath
+        self.poll_interval = poll_interval
+        self.done_file = done_file
+        self.producer_pid = producer_pid
+        self.idle_timeout = idle_timeout
+        self.on_idle = on_idle
+        self.dropped_line = None
+        self.truncated = False
+        self.__file = None
+        self.__partial = ""
+        self.__finish_requested = False
+        self.__complete = False
+        self.__last_data = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            if self.__file is None and not self.__open():
+                line = ""
+            else:
+                line = self.__file.readline()
+            if line:
+                self.__last_data = time.monotonic()
+                line = self.__partial + line
+                self.__partial = ""
+                if line.endswith("\n"):
+                    return line
+                self.__partial = line
+                continue
+            if self.__complete:
+                if self.__partial:
+                    self.dropped_line, self.__partial = self.__partial, ""
+                    self.truncated = True
+                raise StopIteration
+            if self.__is_complete():
+                # Read once more, as data may have been written after
+                # the last read but before the file was complete.
+                self.__complete = True
+                continue
+            if self.on_idle is not None:
+                self.on_idle()
+            time.sleep(self.poll_interval)
+
+    def finish(self):
+        """Marks the file as complete: iteration stops once all data
+        already written has been read.  Safe to call from a signal
+        handler.
+        """
+        self.__finish_requested = True
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __open(self):
+        try:
+            self.__file = open(self.filepath)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def __is_complete(self):
+        if self.producer_pid is not None and \
+                not is_running(self.producer_pid):
+            return True
+        self.truncated = self.__finish_requested or \
+            (self.done_file is not None and os.path.exists(self.done_file)) \
+            or (self.idle_timeout is not None and
+                time.monotonic() - self.__last_data >= self.idle_timeout)
+        return self.truncated
+
+def is_running(pid):
+    """Returns whether a process with the given ID is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError: # Running, but owned by another user
+        return True
+    return True
@@ -0,0 +1,236 @@
+"""
+This module contains classes relating to writing parsed reads to HDF5
+format, and reading them back.  It is only imported when an HDF5 writer
+is selected, so that h5py is not loaded by processes that never write
+HDF5.
+
+Each file records the layout of its reads in the root attribute
+"encoding", which the reader uses to select a matching decoder.
+"""
+import h5py
+import numpy as np
+from .encoding import KMER_ALPHABET, pack_kmers, unpack_kmers, int_dtype, \
+    delta_encode, delta_decode
+from .ont import Read, Event, Kmer
+from .parser import IEventWriter
+
+ENCODING_ATTR = "encoding"
+
+class H5EventWriter(IEventWriter):
+    """Writes reads to an HDF5 file, one group per read and one
+    subgroup per event.
+    """
+    extension = ".h5"
+    encoding = "groups"
+
+    def __init__(self):
+        self.h5file = None
+
+    def open(self, filepath):
+        self.h5file = h5py.File(filepath, "w")
+        self.h5file.attrs[ENCODING_ATTR] = self.encoding
+
+    def write_read(self, read):
+        """Writes a Read object to the open HDF5 file.
+
+        Args:
+            read (Read): Read to be written to file
+        """
+        read_group = self.h5file.create_group("read-{0}".format(read.name), track_order=True)
+        read_group.attrs["name"] = read.name
+        read_group.attrs["contig"] = read.contig
+        for event in read.events:
+            event_group = read_group.create_group("event-{0}".format(event.position))
+            event_group.attrs["position"] = event.position
+            event_group.attrs["ref_kmer"] = event.ref_kmer.sequence
+            event_group.attrs["start_idx"] = event.start_idx
+            event_group.attrs["end_idx"] = event.end_idx
+            if event.samples is not None:
+                event_group.create_dataset("samples", data = event.samples)
+            if event.signal is not None:
+                event_group.create_dataset("signal", data = event.signal)
+        if read.features is not None:
+            read_group.create_dataset("features", data = read.features)
+
+    def remove_read(self, name):
+        del self.h5file["read-{0}".format(name)]
+
+    def flush(self):
+        self.h5file.flush()
+
+    def write_metadata(self, key, value):
+        self.h5file.attrs[key] = value
+
+    def read_metadata(self, filepath, key):
+        try:
+            with h5py.File(filepath, "r") as h5file:
+                value = h5file.attrs.get(key)
+        except OSError:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    def close(self):
+        if self.h5file is not None:
+            self.h5file.close()
+            self.h5file = None
+
+class CompactH5EventWriter(H5EventWriter):
+    """Writes reads to an HDF5 file, one group per read holding one
+    array per event attribute:
+
+        ref_kmer: k-mers packed 2 bits per base (see encoding.py), with
+            the alphabet stored in the root attribute "kmer_alphabet"
+            and k in the read attribute "kmer_length".
+        position_delta, start_idx_delta: Deltas of the positions and
+            start indices, the first values being stored in the read
+            attributes "position_first" and "start_idx_first".
+        idx_length: end_idx - start_idx of each event.
+        sample_counts, samples: Number of samples of each event, and
+            all samples concatenated (only if samples are kept).
+        signal_counts, signal: Length of each event's raw signal, and
+            all of it concatenated (only if signal is attached).
+
+    Each integer array uses the smallest type that holds its values.
+    """
+    encoding = "compact"
+
+    def open(self, filepath):
+        super().open(filepath)
+        self.h5file.attrs["kmer_alphabet"] = KMER_ALPHABET
+
+    def write_read(self, read):
+        """Writes a Read object to the open HDF5 file.
+
+        Args:
+            read (Read): Read to be written to file
+        """
+        read_group = self.h5file.create_group("read-{0}".format(read.name))
+        read_group.attrs["name"] = read.name
+        read_group.attrs["contig"] = read.contig
+        kmers = [event.ref_kmer.sequence for event in read.events]
+        read_group.attrs["kmer_length"] = len(kmers[0])
+        read_group.create_dataset("ref_kmer",
+            data = pack_kmers(kmers))
+        for name in ("position", "start_idx"):
+            first, deltas = delta_encode(
+                [getattr(event, name) for event in read.events])
+            read_group.attrs[name + "_first"] = first
+            read_group.create_dataset(name + "_delta", data = deltas)
+        lengths = [event.end_idx - event.start_idx for event in read.events]
+        read_group.create_dataset("idx_length",
+            data = np.asarray(lengths).astype(int_dtype(lengths)))
+        if read.events[0].samples is not None:
+            counts = [len(event.samples) for event in read.events]
+            read_group.create_dataset("sample_counts",
+                data = np.asarray(counts).astype(
+                    int_dtype(counts, signed=False)))
+            read_group.create_dataset("samples",
+                data = np.concatenate([event.samples for event in read.events]))
+        if read.events[0].signal is not None:
+            counts = [len(event.signal) for event in read.events]
+            read_group.create_dataset("signal_counts",
+                data = np.asarray(counts).astype(
+                    int_dtype(counts, signed=False)))
+            read_group.create_dataset("signal",
+                data = np.concatenate([event.signal for event in read.events]))
+        if read.features is not None:
+            read_group.create_dataset("features", data = read.features)
+
+class H5EventReader:
+    """Reads the reads in an HDF5 file written by an H5EventWriter,
+    decoding them according to the file's encoding.
+
+    Decoders are functions that take a read group and return a Read.
+    They are registered per encoding with register_decoder.
+    """
+    decoders = {}
+
+    @classmethod
+    def register_decoder(cls, encoding_name, decoder):
+        """Registers the decoder for files with an encoding.
+
+        Args:
+            encoding_name (str): Value of the file's "encoding"
+                attribute.
+            decoder (function): Takes an h5py.Group, returns a Read.
+        """
+        cls.decoders[encoding_name] = decoder
+
+    def read_reads(self, filepath):
+        """Yields each read in an HDF5 file.
+
+        Args:
+            filepath (str): HDF5 file to read.
+
+        Raises:
+            ValueError: If no decoder is registered for the file's
+                encoding.
+        """
+        with h5py.File(filepath, "r") as h5file:
+            encoding_name = h5file.attrs.get(ENCODING_ATTR,
+                H5EventWriter.encoding)
+            if isinstance(encoding_name, bytes):
+                encoding_name = encoding_name.decode()
+            if encoding_name not in self.decoders:
+                raise ValueError(encoding_name)
+            decoder = self.decoders[encoding_name]
+            for name in h5file:
+                if name.startswith("read-"):
+                    yield decoder(h5file[name])
+
+def decode_groups(read_group):
+    """Decodes a read written by H5EventWriter."""
+    read = Read(read_group.attrs["name"], read_group.attrs["contig"])
+    for name, event_group in read_group.items():
+        if not name.startswith("event-"):
+            continue
+        samples = None
+        if "samples" in event_group:
+            samples = event_group["samples"][()].tolist()
+        event = Event(int(event_group.attrs["position"]),
+            Kmer(event_group.attrs["ref_kmer"]),
+            int(event_group.attrs["start_idx"]),
+            int(event_group.attrs["end_idx"]), samples)
+        if "signal" in event_group:
+            event.signal = event_group["signal"][()]
+        read.add_event(event)
+    if "features" in read_group:
+        read.features = read_group["features"][()]
+    return read
+
+def decode_compact(read_group):
+    """Decodes a read written by CompactH5EventWriter."""
+    attrs = read_group.attrs
+    read = Read(attrs["name"], attrs["contig"])
+    kmers = unpack_kmers(read_group["ref_kmer"][()],
+        int(attrs["kmer_length"]))
+    positions = delta_decode(attrs["position_first"],
+        read_group["position_delta"][()])
+    starts = delta_decode(attrs["start_idx_first"],
+        read_group["start_idx_delta"][()])
+    ends = starts + read_group["idx_length"][()]
+    samples = [None] * len(kmers)
+    if "samples" in read_group:
+        samples = [s.tolist() for s in
+            _split(read_group["samples"], read_group["sample_counts"])]
+    signal = [None] * len(kmers)
+    if "signal" in read_group:
+        signal = _split(read_group["signal"], read_group["signal_counts"])
+    for i, kmer in enumerate(kmers):
+        event = Event(int(positions[i]), Kmer(kmer), int(starts[i]),
+            int(ends[i]), samples[i])
+        event.signal = signal[i]
+        read.add_event(event)
+    if "features" in read_group:
+        read.features = read_group["features"][()]
+    return read
+
+def _split(dataset, counts_dataset):
+    """Splits a concatenated dataset into one array per event."""
+    bounds = np.cumsum(counts_dataset[()])[:-1]
+    return np.split(dataset[()], bounds)
+
+H5EventReader.register_decoder(H5EventWriter.encoding, decode_groups)
+H5EventReader.register_decoder(CompactH5EventWriter.encoding, decode_compact)
@@ -12,11 +12,15 @@ class Read:
         contig (str): Reference contig to which this read maps.
         events ([Event]): Ordered list of events that occurred during
             the sequencing of this read.
+        features (numpy.ndarray): Typed per-event features (one record
+            per event, see features.FEATURE_DTYPE), or None if they are
+            not computed.
     """
     def __init__(self, name, contig):
         self.name = name
         self.contig = contig
         self.events = []
+        self.features = None
 
     def add_event(self, event):
         """Adds an event to this Read in chronological order.
@@ -34,27 +38,110 @@ class Event:
         position (int): Position of the event with respect to the 
             reference contig that the read has been mapped to.
         ref_kmer (str): Reference k-mer associated with the event.
-        samples ([float]): List of current measurements associated with
-            the event.
         start_idx (int): Start index of this event in the raw signal.
         end_idx (int): End index of this event in the raw signal.
+        samples ([float]): List of current measurements associated with
+            the event, or None if samples are not kept.
+    
+    Attributes:
+        stats (EventStatistics): Summary statistics of the event, or 
+            None if they are not computed.
+        signal (numpy.ndarray): Raw signal between start_idx and 
+            end_idx, or None if it is not attached.
     """
-    def __init__(self, position, ref_kmer, start_idx, end_idx):
+    def __init__(self, position, ref_kmer, start_idx, end_idx, 
+        samples=None):
         self.position = position
         self.ref_kmer = ref_kmer
-        # self.samples = samples
+        self.samples = samples
         self.start_idx = start_idx
         self.end_idx = end_idx
+        self.stats = None
+        self.signal = None
+
+    def add_samples(self, samples, before=False):
+        """Adds samples to this Event, keeping them in chronological
+        order.
+
+        Args:
+            samples ([float]): List of current measurements to add to
+                this event.
+            before (bool): Whether these samples occurred before the
+                samples already held by this Event, rather than after.
+        """
+        if before:
+            self.samples[:0] = samples
+        else:
+            self.samples.extend(samples)
+
+class EventStatistics:
+    """Summary statistics of an event, combined from every row that
+    the event is split across.  Means are weighted by the number of 
+    samples in each row and the standard deviation is pooled, so the
+    result equals the statistics of all of the event's samples taken
+    together.
 
-    # def add_samples(self, samples):
-    #     """Adds samples to this Event in chronological order.
+    Args:
+        n_samples (int): Number of samples in the first row.
+        level_mean (float): Mean current of the first row.
+        level_stdv (float): Standard deviation of the current of the 
+            first row.
+        dwell_time (float): Duration (s) of the first row.
+        model_mean (float): Expected mean current of the k-mer.
+        model_stdv (float): Expected standard deviation of the current
+            of the k-mer.
+        standardized_level (float): Standardized current of the first 
+            row.
 
-    #     Args:
-    #         samples ([float]): List of current measurements to add to
-    #             this event (assuming these samples occurred after the
-    #             samples already held by this Event).
-    #     """
-    #     self.samples.extend(samples)
+    Attributes:
+        n_samples (int): Total number of samples.
+        level_mean (float): Mean current.
+        level_stdv (float): Standard deviation of the current.
+        dwell_time (float): Total duration (s).
+        model_mean (float): Expected mean current of the k-mer.
+        model_stdv (float): Expected standard deviation of the current
+            of the k-mer.
+        standardized_level (float): Standardized current.
+    """
+    def __init__(self, n_samples, level_mean, level_stdv, dwell_time,
+        model_mean, model_stdv, standardized_level):
+        self.n_samples = n_samples
+        self.level_mean = level_mean
+        self.__sum_sq = n_samples * level_stdv ** 2
+        self.dwell_time = dwell_time
+        self.model_mean = model_mean
+        self.model_stdv = model_stdv
+        self.standardized_level = standardized_level
+
+    @property
+    def level_stdv(self):
+        if self.n_samples == 0:
+            return 0.0
+        return (self.__sum_sq / self.n_samples) ** 0.5
+
+    def add(self, n_samples, level_mean, level_stdv, dwell_time,
+        standardized_level):
+        """Combines the statistics of another row of this event.
+
+        Args:
+            n_samples (int): Number of samples in the row.
+            level_mean (float): Mean current of the row.
+            level_stdv (float): Standard deviation of the current of 
+                the row.
+            dwell_time (float): Duration (s) of the row.
+            standardized_level (float): Standardized current of the row.
+        """
+        total = self.n_samples + n_samples
+        if total == 0:
+            return
+        delta = level_mean - self.level_mean
+        self.__sum_sq += n_samples * level_stdv ** 2 + \
+            delta ** 2 * self.n_samples * n_samples / total
+        self.level_mean += delta * n_samples / total
+        self.standardized_level += \
+            (standardized_level - self.standardized_level) * n_samples / total
+        self.dwell_time += dwell_time
+        self.n_samples = total
 
 class Kmer:
     """Represents a k-mer.
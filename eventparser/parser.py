@@ -1,10 +1,15 @@
 """
-This module contains classes relating to parsing aligned event files, 
+This module contains classes relating to parsing aligned event files,
 generated by any software, to allow downstream event processing.
+
+Note: No output format library (e.g. h5py) is imported here.  Writers
+are loaded on demand by the factory so that short-lived processes only
+pay for the backends they actually use.
 """
-import csv
-import h5py
+import os
+import time
 from abc import ABC, abstractmethod
+from .cache import CACHE_KEY_ATTR
 
 class IReadParser(ABC):
     """Interface to be implemented by classes that parse reads from
@@ -14,6 +19,83 @@ class IReadParser(ABC):
     def parse_reads(self):
         pass
 
+    def options(self):
+        """Returns the options that determine the reads parsed by this
+        ReadParser, as a JSON-serialisable dict.
+        """
+        return {}
+
+class IEventWriter(ABC):
+    """Interface to be implemented by classes that write parsed reads
+    to an output file.
+
+    Attributes:
+        extension (str): File extension (including the leading dot) of
+            files written by this writer.
+    """
+    extension = ""
+
+    @abstractmethod
+    def open(self, filepath):
+        """Opens the output file for writing.
+
+        Args:
+            filepath (str): Path of the output file.
+        """
+        pass
+
+    @abstractmethod
+    def write_read(self, read):
+        """Writes a Read object to the open output file.
+
+        Args:
+            read (Read): Read to be written to file.
+        """
+        pass
+
+    def remove_read(self, name):
+        """Removes a read previously written to the open output file.
+        Only needed by parsers with a sampler.
+
+        Args:
+            name (str): Name of the read.
+
+        Raises:
+            NotImplementedError: If this writer cannot remove reads.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        """Closes the output file."""
+        pass
+
+    def flush(self):
+        """Flushes reads written so far to the output file.  Writers
+        that write through may ignore this.
+        """
+        pass
+
+    def write_metadata(self, key, value):
+        """Stores a file-level metadata value in the open output file.
+        Writers whose format has no metadata may ignore this.
+
+        Args:
+            key (str): Metadata key.
+            value (str): Metadata value.
+        """
+        pass
+
+    def read_metadata(self, filepath, key):
+        """Returns a file-level metadata value from an output file
+        written by this writer, or None if it is not present.
+
+        Args:
+            filepath (str): Path of the output file.
+            key (str): Metadata key.
+        """
+        return None
+
 class AlignedEventParser:
     """For parsing aligned event files into HDF5 format.  Regardless
     of the software used to align events, the output HDF5 format should
@@ -22,38 +104,140 @@ class AlignedEventParser:
     Args & Attributes:
         read_parser (IReadParser): Used by this Parser for parsing reads
             in the aligned event file.
+        writer (IEventWriter): Used by this Parser for writing reads to
+            the output file.  Defaults to an H5EventWriter.
+        sampler (CoverageSampler): If given, only the reads it samples
+            are written.  Reads it evicts after they were written are
+            removed with the writer's remove_read.
+        signal_attacher (SignalAttacher): If given, used to attach raw
+            signal to each event before it is written.
     """
-    def __init__(self, read_parser):
+    def __init__(self, read_parser, writer=None, sampler=None,
+        signal_attacher=None):
         self.read_parser = read_parser
+        self.sampler = sampler
+        self.signal_attacher = signal_attacher
+        if writer is None:
+            from .h5 import H5EventWriter
+            writer = H5EventWriter()
+        self.writer = writer
 
-    def parse(self, filepath, output_dir):
-        """Parses an aligned event file and writes it to HDF5 format.
+    def output_filepath(self, filepath, output_dir):
+        """Returns the path of the file that parse() writes to.
 
         Args:
             filepath (str): Name of the aligned event file.
-            output_dir (str): Directory to write the HDF5 file to.
+            output_dir (str): Directory to write the output file to.
         """
-        h5_filename = filepath.split("/")[-1].split(".")[0] + ".h5"
-        h5_filepath = output_dir + "/" + h5_filename
-        with open(filepath) as in_file:
-            with h5py.File(h5_filepath, "w") as out_file:
-                for read in self.read_parser.parse_reads(in_file):
-                    self.__write_read_to_h5(read, out_file)
+        out_filename = filepath.split("/")[-1].split(".")[0] + \
+            self.writer.extension
+        return output_dir + "/" + out_filename
 
-    def __write_read_to_h5(self, read, h5file):
-        """Writes a Read object to an HDF5 file.
+    def options(self):
+        """Returns the options that determine this Parser's output, as
+        a JSON-serialisable dict.  Two parses of the same input with
+        equal options produce equivalent output.
+        """
+        return {"read_parser": type(self.read_parser).__name__,
+                "read_parser_options": self.read_parser.options(),
+                "writer": type(self.writer).__name__,
+                "sampler": self.sampler.options() if self.sampler else None,
+                "signal": self.signal_attacher.options()
+                    if self.signal_attacher else None}
+
+    def parse(self, filepath, output_dir, cache=None, follow=None,
+        flush_interval=60):
+        """Parses an aligned event file and writes it to the output
+        format of this Parser's writer (HDF5 by default).
+
+        The output is written to a temporary file which replaces the
+        output file once complete, so an interrupted parse never leaves
+        a partial output behind.
 
         Args:
-            read (Read): Read to be written to file
-            h5file (file object): HDF5 file to write to
-        """
-        read_group = h5file.create_group("read-{0}".format(read.name), track_order=True)
-        read_group.attrs["name"] = read.name
-        read_group.attrs["contig"] = read.contig
-        for event in read.events:
-            event_group = read_group.create_group("event-{0}".format(event.position))
-            event_group.attrs["position"] = event.position
-            event_group.attrs["ref_kmer"] = event.ref_kmer.sequence
-            event_group.attrs["start_idx"] = event.start_idx
-            event_group.attrs["end_idx"] = event.end_idx
-            # event_group.create_dataset("samples", data = event.samples)
+            filepath (str): Name of the aligned event file.
+            output_dir (str): Directory to write the output file to.
+            cache (ConversionCache): If given, the parse is skipped
+                when this cache holds the output of an identical input
+                parsed with identical options.
+            follow (FollowFile): If given, the aligned event file is
+                read through it while it is still being written.  Each
+                read is written as soon as the next read starts, and
+                the temporary file is flushed whenever the parse catches
+                up with the end of the file (after calling the follow's
+                own on_idle, if any), and at least every flush_interval
+                seconds.
+            flush_interval (float): See follow.
+
+        Returns:
+            str: Path of the output file.
+
+        Raises:
+            ValueError: If both cache and follow are given.
+        """
+        if cache is not None and follow is not None:
+            raise ValueError("Cannot cache a file that is being followed")
+        out_filepath = self.output_filepath(filepath, output_dir)
+        key = None
+        if cache is not None:
+            key = cache.key(filepath, self.options())
+            if cache.reuse(key, out_filepath, self.writer):
+                return out_filepath
+        tmp_filepath = out_filepath + ".tmp"
+        in_file = follow if follow is not None else open(filepath)
+        with in_file:
+            self.writer.open(tmp_filepath)
+            try:
+                if follow is None:
+                    for read in self.__reads(in_file):
+                        self.writer.write_read(read)
+                else:
+                    self.__write_following(in_file, flush_interval)
+                if key is not None:
+                    self.writer.write_metadata(CACHE_KEY_ATTR, key)
+            except BaseException:
+                self.writer.close()
+                os.remove(tmp_filepath)
+                raise
+            self.writer.close()
+        os.replace(tmp_filepath, out_filepath)
+        if cache is not None:
+            cache.store(key, out_filepath)
+        return out_filepath
+
+    def __write_following(self, follow, flush_interval):
+        unflushed = 0
+        last_flush = time.monotonic()
+        on_idle = follow.on_idle
+
+        def flush():
+            nonlocal unflushed, last_flush
+            if unflushed:
+                self.writer.flush()
+                unflushed = 0
+            last_flush = time.monotonic()
+
+        def flush_on_idle():
+            if on_idle is not None:
+                on_idle()
+            flush()
+
+        follow.on_idle = flush_on_idle
+        try:
+            for read in self.__reads(follow):
+                self.writer.write_read(read)
+                unflushed += 1
+                if time.monotonic() - last_flush >= flush_interval:
+                    flush()
+        finally:
+            follow.on_idle = on_idle
+
+    def __reads(self, in_file):
+        if self.sampler is None:
+            reads = self.read_parser.parse_reads(in_file)
+        else:
+            reads = self.sampler.sample(self.read_parser, in_file,
+                self.writer.remove_read)
+        if self.signal_attacher is not None:
+            reads = self.signal_attacher.attach_all(reads)
+        return reads
@@ -0,0 +1,108 @@
+"""
+This module contains classes relating to down-sampling reads, so that
+conversion time and output size scale with the coverage needed for
+downstream analysis rather than with the raw sequencing depth.
+"""
+import random
+from collections import deque
+
+class CoverageSampler:
+    """Keeps at most max_reads reads per contig, or per window of
+    positions within a contig, chosen uniformly at random by reservoir
+    sampling in a single pass over the reads.
+
+    Whether a read is kept is decided from its first row, so the events
+    of rejected reads are never parsed.  Each kept read is yielded as
+    soon as it is parsed, and on_evict is called with its name if a
+    later read replaces it in the reservoir, so only the names of kept
+    reads are held in memory.  The same seed always keeps the same
+    reads of the same input.
+
+    Args & Attributes:
+        max_reads (int): Maximum number of reads kept per contig (or
+            per window).
+        window (int): If given, reads are grouped by contig and by the
+            window of this many positions containing their first
+            event, rather than by contig only.
+        seed (int): Seed of the random number generator.
+    """
+    def __init__(self, max_reads, window=None, seed=0):
+        if max_reads < 1:
+            raise ValueError("max_reads must be positive")
+        if window is not None and window < 1:
+            raise ValueError("window must be positive")
+        self.max_reads = max_reads
+        self.window = window
+        self.seed = seed
+
+    def options(self):
+        """Returns the options of this sampler, as a JSON-serialisable
+        dict.
+        """
+        return {"max_reads": self.max_reads, "window": self.window,
+                "seed": self.seed}
+
+    def key(self, contig, position):
+        """Returns the group (contig or contig window) of a read.
+
+        Args:
+            contig (str): Contig the read maps to.
+            position (int): Position of the read's first event.
+        """
+        if self.window is None:
+            return contig
+        return (contig, position // self.window)
+
+    def sample(self, read_parser, in_file, on_evict):
+        """Yields each read of an aligned event file that is kept when
+        it is parsed.  A yielded read that is later replaced by another
+        is reported to on_evict, so the reads finally kept are those
+        yielded and never evicted.
+
+        Args:
+            read_parser (IReadParser): Parses reads from in_file.  Its
+                parse_reads must accept an "accept" function.
+            in_file (file object): Aligned event file to parse.
+            on_evict (function): Called with the name of each yielded
+                read that is no longer kept.
+        """
+        rng = random.Random(self.seed)
+        seen = {}
+        # Per group, the entries of the reads currently kept
+        reservoirs = {}
+        # Entries of accepted reads not yet parsed, in order
+        pending = deque()
+
+        def accept(name, contig, position):
+            key = self.key(contig, position)
+            seen[key] = seen.get(key, 0) + 1
+            reservoir = reservoirs.setdefault(key, [])
+            entry = _Entry(name)
+            if len(reservoir) < self.max_reads:
+                reservoir.append(entry)
+            else:
+                slot = rng.randrange(seen[key])
+                if slot >= self.max_reads:
+                    return False
+                evicted = reservoir[slot]
+                if evicted.yielded:
+                    on_evict(evicted.name)
+                else:
+                    evicted.evicted = True
+                reservoir[slot] = entry
+            pending.append(entry)
+            return True
+
+        for read in read_parser.parse_reads(in_file, accept):
+            entry = pending.popleft()
+            if entry.evicted: # Replaced before it was parsed
+                continue
+            entry.yielded = True
+            yield read
+
+class _Entry:
+    """A read kept in a reservoir."""
+    def __init__(self, name):
+        self.name = name
+        self.yielded = False
+        self.evicted = False
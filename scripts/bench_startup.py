@@ -0,0 +1,79 @@
+"""
+This script measures the start-up cost of eventparser, i.e. the time a
+fresh Python process takes to import the package and run the CLI, and
+reports which optional heavy modules (e.g. h5py) were loaded.
+
+This script should be invoked as follows:
+
+usage: bench_startup.py [-h] [-n REPEATS] [input_file]
+
+positional arguments:
+  input_file            Eventalign file to dry-run the CLI on
+                        (default: demo/demo_eventalign.tsv).
+
+optional arguments:
+  -h, --help            show this help message and exit
+  -n, --repeats         Number of runs per measurement (default: 10).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["h5py", "numpy"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "scripts", "parse_aligned_events.py")
+
+def time_command(cmd, repeats):
+    """Returns the median wall time (s) of running cmd repeats times."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, env=env, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def loaded_modules(statement):
+    """Returns the heavy modules loaded after executing statement."""
+    code = "import sys\n{0}\nprint(' '.join(m for m in {1} if m in sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", code.format(statement, HEAVY_MODULES)],
+        check=True, env=dict(os.environ, PYTHONPATH=ROOT),
+        stdout=subprocess.PIPE, universal_newlines=True)
+    return out.stdout.split()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures eventparser start-up time.")
+    parser.add_argument("input_file", nargs="?",
+                        default=os.path.join(ROOT, "demo", "demo_eventalign.tsv"),
+                        help="Eventalign file to dry-run the CLI on.")
+    parser.add_argument("-n", "--repeats", type=int, default=10,
+                        help="Number of runs per measurement.")
+    args = parser.parse_args()
+
+    benchmarks = [
+        ("python (baseline)", [sys.executable, "-c", "pass"],
+            "pass"),
+        ("import eventparser.factory",
+            [sys.executable, "-c", "import eventparser.factory"],
+            "import eventparser.factory"),
+        ("import eventparser.h5",
+            [sys.executable, "-c", "import eventparser.h5"],
+            "import eventparser.h5"),
+        ("cli --dry-run",
+            [sys.executable, CLI, args.input_file, "eventalign", "--dry-run"],
+            None),
+    ]
+    print("{0:<30}{1:>12}  {2}".format("benchmark", "median (ms)", "loaded"))
+    for name, cmd, statement in benchmarks:
+        elapsed = time_command(cmd, args.repeats)
+        loaded = loaded_modules(statement) if statement else []
+        print("{0:<30}{1:>12.1f}  {2}".format(name, elapsed * 1000,
+            ",".join(loaded) or "-"))
+
+if __name__ == "__main__":
+    main()
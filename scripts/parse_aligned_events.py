@@ -6,7 +6,17 @@ eventalign module, or Tombo.
 
 This script should be invoked as follows:
 
-usage: parse_aligned_events.py [-h] [-o OUTPUT] input_file {eventalign,tombo}
+usage: parse_aligned_events.py [-h] [-o OUTPUT] [-w WRITER] [--dry-run]
+                               [--cache-dir CACHE_DIR] [--full-hash]
+                               [--features] [--samples]
+                               [--max-reads MAX_READS] [--window WINDOW]
+                               [--seed SEED] [--fast5-dir FAST5_DIR]
+                               [--raw-signal] [--follow]
+                               [--producer-pid PRODUCER_PID]
+                               [--done-file DONE_FILE]
+                               [--idle-timeout IDLE_TIMEOUT]
+                               [--flush-interval FLUSH_INTERVAL]
+                               input_file {eventalign,tombo}
 
 positional arguments:
   input_file            The aligned event file to be parsed
@@ -15,10 +25,44 @@ positional arguments:
 optional arguments:
   -h, --help            show this help message and exit
   -o, --output          dir to write the HDF5 file to.
+  -w, --writer          Output format (default: hdf5).
+  --dry-run             Parse the input without writing any output.
+  --cache-dir           Reuse outputs of unchanged inputs, recording
+                        conversions in this directory.
+  --full-hash           Hash whole input files for the cache, rather
+                        than sampled blocks.
+  --features            Compute per-event signal features.
+  --samples             Keep the current samples of each event.
+  --max-reads           Keep at most this many randomly sampled reads
+                        per contig.
+  --window              With --max-reads, cap reads per window of this
+                        many positions rather than per contig.
+  --seed                Seed for sampling reads (default: 0).
+  --fast5-dir           Attach each event's raw signal from the FAST5
+                        files in this directory.
+  --raw-signal          With --fast5-dir, keep raw DAC values rather
+                        than converting the signal to pA.
+  --follow              Convert the input while it is still being
+                        written, until the producer exits, the done
+                        file appears, the input is idle for
+                        --idle-timeout seconds, or SIGUSR1 is received.
+  --producer-pid        With --follow, ID of the process writing the
+                        input.
+  --done-file           With --follow, file whose creation marks the
+                        input as complete.
+  --idle-timeout        With --follow, seconds without new input after
+                        which the input is complete.
+  --flush-interval      With --follow, maximum seconds between flushes
+                        of the output (default: 60).
 """
 import argparse
+import signal
 import sys
-from eventparser.factory import AlignedEventParserFactory, AlignedEventType
+from eventparser.cache import ConversionCache
+from eventparser.follow import FollowFile
+from eventparser.sampling import CoverageSampler
+from eventparser.factory import AlignedEventParserFactory, AlignedEventType, \
+    read_parsers
 
 def check_format(in_file):
     file_format = in_file.split(".")[-1]
@@ -38,9 +82,112 @@ def parse_args(args):
     parser.add_argument("-o", "--output",
                         default="",
                         help="dir to write the HDF5 file to.")
-    return parser.parse_args()
+    parser.add_argument("-w", "--writer",
+                        default="hdf5",
+                        help="Output format (default: hdf5).")
+    parser.add_argument("--dry-run",
+                        action="store_true",
+                        help="Parse the input without writing any output.")
+    parser.add_argument("--cache-dir",
+                        default=None,
+                        help="Reuse outputs of unchanged inputs, recording "
+                             "conversions in this directory.")
+    parser.add_argument("--full-hash",
+                        action="store_true",
+                        help="Hash whole input files for the cache, rather "
+                             "than sampled blocks.")
+    parser.add_argument("--features",
+                        action="store_true",
+                        help="Compute per-event signal features.")
+    parser.add_argument("--samples",
+                        action="store_true",
+                        help="Keep the current samples of each event.")
+    parser.add_argument("--max-reads",
+                        type=int,
+                        default=None,
+                        help="Keep at most this many randomly sampled reads "
+                             "per contig.")
+    parser.add_argument("--window",
+                        type=int,
+                        default=None,
+                        help="With --max-reads, cap reads per window of this "
+                             "many positions rather than per contig.")
+    parser.add_argument("--seed",
+                        type=int,
+                        default=0,
+                        help="Seed for sampling reads (default: 0).")
+    parser.add_argument("--fast5-dir",
+                        default=None,
+                        help="Attach each event's raw signal from the FAST5 "
+                             "files in this directory.")
+    parser.add_argument("--raw-signal",
+                        action="store_true",
+                        help="With --fast5-dir, keep raw DAC values rather "
+                             "than converting the signal to pA.")
+    parser.add_argument("--follow",
+                        action="store_true",
+                        help="Convert the input while it is still being "
+                             "written.")
+    parser.add_argument("--producer-pid",
+                        type=int,
+                        default=None,
+                        help="With --follow, ID of the process writing the "
+                             "input.")
+    parser.add_argument("--done-file",
+                        default=None,
+                        help="With --follow, file whose creation marks the "
+                             "input as complete.")
+    parser.add_argument("--idle-timeout",
+                        type=float,
+                        default=None,
+                        help="With --follow, seconds without new input after "
+                             "which the input is complete.")
+    parser.add_argument("--flush-interval",
+                        type=float,
+                        default=60,
+                        help="With --follow, maximum seconds between flushes "
+                             "of the output (default: 60).")
+    parsed = parser.parse_args()
+    if parsed.follow and parsed.cache_dir is not None:
+        parser.error("--cache-dir cannot be used with --follow")
+    if not parsed.follow:
+        for option in ["producer_pid", "done_file", "idle_timeout"]:
+            if getattr(parsed, option) is not None:
+                parser.error("--{0} requires --follow".format(
+                    option.replace("_", "-")))
+    return parsed
 
-def parse_file(in_file, file_type, out_dir):
+def dry_run(in_file, event_type, read_parser_options, sampler=None):
+    """Parses in_file without loading any writer backend, and prints
+    the number of reads and events found.
+    """
+    read_parser = read_parsers.load(event_type.value)(**read_parser_options)
+    n_reads = 0
+    n_events = 0
+    # Events of each read written, for subtracting evicted reads
+    read_events = {}
+
+    def evict(name):
+        nonlocal n_reads, n_events
+        n_reads -= 1
+        n_events -= read_events.pop(name)
+
+    with open(in_file) as f:
+        if sampler is None:
+            reads = read_parser.parse_reads(f)
+        else:
+            reads = sampler.sample(read_parser, f, evict)
+        for read in reads:
+            n_reads += 1
+            n_events += len(read.events)
+            if sampler is not None:
+                read_events[read.name] = len(read.events)
+    print("{0}: {1} reads, {2} events".format(in_file, n_reads, n_events))
+
+def parse_file(in_file, file_type, out_dir, writer="hdf5", dry=False,
+    cache_dir=None, full_hash=False, features=False, samples=False,
+    max_reads=None, window=None, seed=0, fast5_dir=None, raw_signal=False,
+    follow_options=None, flush_interval=60):
     if file_type == "eventalign":
         event_type = AlignedEventType.NANOPOLISH_EVENTALIGN
     elif file_type == "tombo":
@@ -49,13 +196,68 @@ def parse_file(in_file, file_type, out_dir):
         return
     else:
         raise ValueError(file_type)
+    read_parser_options = {}
+    if features:
+        read_parser_options["features"] = True
+    if samples:
+        read_parser_options["keep_samples"] = True
+    sampler = None
+    if max_reads is not None:
+        sampler = CoverageSampler(max_reads, window, seed)
+    if dry:
+        dry_run(in_file, event_type, read_parser_options, sampler)
+        return
+    signal_attacher = None
+    if fast5_dir is not None:
+        # Imported here as it loads h5py
+        from eventparser.fast5 import SignalAttacher
+        signal_attacher = SignalAttacher(fast5_dir, scale=not raw_signal)
     factory = AlignedEventParserFactory()
-    parser = factory.create(event_type)
-    parser.parse(in_file, out_dir)
+    parser = factory.create(event_type, writer, sampler, signal_attacher,
+        **read_parser_options)
+    cache = None
+    if cache_dir is not None:
+        cache = ConversionCache(cache_dir, full_hash)
+    follow = None
+    previous_handler = None
+    if follow_options is not None:
+        follow = FollowFile(in_file, **follow_options)
+        if hasattr(signal, "SIGUSR1"):
+            previous_handler = signal.signal(signal.SIGUSR1,
+                lambda *_: follow.finish())
+    try:
+        out_file = parser.parse(in_file, out_dir, cache, follow,
+            flush_interval)
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGUSR1, previous_handler)
+    if follow is not None and follow.dropped_line is not None:
+        print("{0} ended in an incomplete line, which was dropped".format(
+            in_file))
+    if follow is not None and follow.truncated:
+        print("The last read of {0} may be incomplete, so it was not "
+            "written".format(in_file))
+    if cache is not None and cache.hits:
+        print("{0} is unchanged, reusing {1}".format(in_file, out_file))
+    elif signal_attacher is not None:
+        if signal_attacher.missing:
+            print("{0} reads had no signal in {1}".format(
+                signal_attacher.missing, fast5_dir))
+        if signal_attacher.out_of_range:
+            print("{0} reads had events beyond the end of their signal in "
+                "{1}".format(signal_attacher.out_of_range, fast5_dir))
 
 def main():
     args = parse_args(sys.argv[1:])
-    parse_file(args.input_file, args.file_type, args.output)
+    follow_options = None
+    if args.follow:
+        follow_options = {"producer_pid": args.producer_pid,
+                          "done_file": args.done_file,
+                          "idle_timeout": args.idle_timeout}
+    parse_file(args.input_file, args.file_type, args.output, args.writer,
+        args.dry_run, args.cache_dir, args.full_hash, args.features,
+        args.samples, args.max_reads, args.window, args.seed, args.fast5_dir,
+        args.raw_signal, follow_options, args.flush_interval)
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,18 @@
+import re
 import setuptools
 
 with open("README.md", "r") as readme:
     long_description = readme.read()
 
+# The version is also part of conversion cache keys, so it is defined
+# only once, in the package
+with open("eventparser/__init__.py", "r") as init:
+    version = re.search(r'^__version__ = "([^"]+)"', init.read(),
+        re.MULTILINE).group(1)
+
 setuptools.setup(
     name="eventparser",
-    version="1.0",
+    version=version,
     author="Alex Sneddon",
     author_email="Alexandra.Sneddon@anu.edu.au",
     description="A package to parse eventalign files produced by Nanopolish to an intermediate data format, to improve the ease of downstream processing.",
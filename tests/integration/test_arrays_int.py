@@ -0,0 +1,80 @@
+import pytest
+from eventparser.arrays import parse_to_arrays, parse_to_frame
+from eventparser.eventalign import EventalignReadParser
+
+IN="tests/integration/data/eventalign/"
+FILES = ["single_read.tsv", "multiple_reads.tsv", "repeated_position.tsv",
+    "skipped_position.tsv", "model_kmer_NNNNN.tsv", "repeated_kmer.tsv",
+    "position_ordering.tsv"]
+
+def parse_events(filename, features=False):
+    with open(IN + filename) as f:
+        reads = list(EventalignReadParser(features=features).parse_reads(f))
+    return [(read, event) for read in reads for event in read.events]
+
+@pytest.mark.parametrize("filename", FILES)
+def test_parse_to_arrays_matches_parse_reads(filename):
+    arrays = parse_to_arrays(IN + filename)
+    expected = parse_events(filename)
+    assert len(arrays) == len(expected)
+    actual = list(zip(arrays.decode("read_name"), arrays.decode("contig"),
+        arrays["position"].tolist(), arrays.decode("ref_kmer"),
+        arrays["start_idx"].tolist(), arrays["end_idx"].tolist()))
+    assert actual == [(read.name, read.contig, event.position, 
+        event.ref_kmer.sequence, event.start_idx, event.end_idx)
+        for read, event in expected]
+
+def test_parse_to_arrays_with_features_matches_event_statistics():
+    arrays = parse_to_arrays(IN + "repeated_position.tsv", features=True)
+    expected = parse_events("repeated_position.tsv", features=True)
+    for i, (_, event) in enumerate(expected):
+        stats = event.stats
+        assert arrays["n_samples"][i] == stats.n_samples
+        assert arrays["level_mean"][i] == pytest.approx(stats.level_mean)
+        assert arrays["level_stdv"][i] == pytest.approx(stats.level_stdv)
+        assert arrays["dwell_time"][i] == pytest.approx(stats.dwell_time)
+        assert arrays["standardized_level"][i] == \
+            pytest.approx(stats.standardized_level)
+
+def test_parse_to_frame_has_categorical_columns():
+    pytest.importorskip("pandas")
+    with open(IN + "multiple_reads.tsv") as f:
+        frame = parse_to_frame(f)
+    assert len(frame) == len(parse_events("multiple_reads.tsv"))
+    assert frame["read_name"].dtype.name == "category"
+    assert frame["ref_kmer"].dtype.name == "category"
+    assert frame["position"].dtype.name == "int64"
+
+def write_invalid_only(tmp_path, header_only):
+    with open(IN + "model_kmer_NNNNN.tsv") as f:
+        lines = f.readlines()
+    if not header_only:
+        lines = [lines[0]] + [line for line in lines[1:]
+            if line.split("\t")[9] == "NNNNN"]
+    else:
+        lines = lines[:1]
+    filepath = tmp_path / "invalid.tsv"
+    filepath.write_text("".join(lines))
+    return str(filepath)
+
+@pytest.mark.parametrize("header_only", [True, False])
+@pytest.mark.parametrize("features", [False, True])
+def test_parse_to_arrays_without_valid_rows_is_empty(tmp_path, header_only,
+    features):
+    arrays = parse_to_arrays(write_invalid_only(tmp_path, header_only),
+        features=features)
+    assert len(arrays) == 0
+    assert arrays["position"].dtype.name == "int64"
+    assert arrays["start_idx"].dtype.name == "int64"
+    assert arrays["read_name"].dtype.name == "int32"
+    assert list(arrays.decode("read_name")) == []
+    if features:
+        assert len(arrays["level_mean"]) == 0
+        assert arrays["level_mean"].dtype.name == "float64"
+
+def test_parse_to_arrays_with_empty_file_is_empty(tmp_path):
+    filepath = tmp_path / "empty.tsv"
+    filepath.write_text("")
+    arrays = parse_to_arrays(str(filepath), features=True)
+    assert len(arrays) == 0
+    assert len(arrays["level_mean"]) == 0
@@ -1,7 +1,9 @@
 import csv
 import json
 import pytest
+import statistics
 from eventparser.eventalign import EventalignReadParser
+from eventparser.sampling import CoverageSampler
 
 IN="tests/integration/data/eventalign/"
 OUT="tests/integration/data/json/"
@@ -271,3 +273,85 @@ def test_parse_reads_with_repeated_kmer_returns_separate_events(
     for i, event in enumerate(reads[0].events):
         expected_event = repeated_kmer_expected["events"][i]
         assert is_event_correct(event, expected_event) == True
+
+"""
+Test computing features for an EventAlign file that contains a repeated
+position (see above).
+
+In this case, the features of position 1408 should combine all four 
+rows: means weighted by each row's number of samples, and the standard 
+deviation pooled.
+"""
+def test_parse_reads_with_features_combines_repeated_position(
+    repeated_position_test_file):
+    parser = EventalignReadParser(features=True)
+    reads = list(parser.parse_reads(repeated_position_test_file))
+    features = reads[0].features
+    assert len(features) == len(reads[0].events)
+    row = features[features["position"] == 1408][0]
+    n = [16, 19, 10, 15]
+    means = [155.97, 143.32, 156.18, 139.11]
+    stdvs = [5.479, 11.773, 4.811, 10.884]
+    mean = sum(a * b for a, b in zip(n, means)) / sum(n)
+    var = sum(a * (s ** 2 + (m - mean) ** 2) 
+        for a, m, s in zip(n, means, stdvs)) / sum(n)
+    assert row["n_samples"] == sum(n)
+    assert row["level_mean"] == pytest.approx(mean)
+    assert row["level_stdv"] == pytest.approx(var ** 0.5)
+    assert row["dwell_time"] == pytest.approx(0.00531 + 0.00631 + 0.00332 + 0.00498)
+    assert row["model_mean"] == pytest.approx(147.06)
+
+def test_parse_reads_with_keep_samples_concatenates_samples(
+    repeated_position_test_file):
+    parser = EventalignReadParser(features=True, keep_samples=True)
+    reads = list(parser.parse_reads(repeated_position_test_file))
+    for event, row in zip(reads[0].events, reads[0].features):
+        assert len(event.samples) > 0
+        assert row["median"] == pytest.approx(statistics.median(event.samples))
+    # Event 1408 spans rows 4-7, whose samples are in reverse
+    # chronological order
+    repeated_position_test_file.seek(0)
+    rows = list(csv.reader(repeated_position_test_file, delimiter="\t"))
+    expected = [float(x) for row in reversed(rows[4:8])
+        for x in row[15].split(",")]
+    event = [e for e in reads[0].events if e.position == 1408][0]
+    assert event.samples == expected
+
+def test_parse_reads_with_keep_samples_and_no_samples_column(tmp_path):
+    with open("{0}single_read.tsv".format(IN)) as f:
+        lines = [line.rsplit("\t", 1)[0] + "\n" for line in f]
+    filepath = tmp_path / "no_samples.tsv"
+    filepath.write_text("".join(lines))
+    parser = EventalignReadParser(keep_samples=True)
+    with open(str(filepath)) as f:
+        with pytest.raises(ValueError):
+            list(parser.parse_reads(f))
+
+"""
+Test sampling reads from an EventAlign file with one read per contig 
+(see test_parse_reads_with_multiple_read_file_returns_multiple_reads).
+
+In this case, capping coverage at one read per contig should keep every
+read, with their events unchanged.
+"""
+def test_sample_with_one_read_per_contig_keeps_all_reads(
+    multiple_read_test_file, multiple_read_expected):
+    sampler = CoverageSampler(1)
+    evicted = []
+    reads = list(sampler.sample(EventalignReadParser(), multiple_read_test_file,
+        evicted.append))
+    assert evicted == []
+    assert len(reads) == len(multiple_read_expected)
+    for i, _ in enumerate(reads):
+        for j, event in enumerate(reads[i].events):
+            expected_event = multiple_read_expected[i]["events"][j]
+            assert is_event_correct(event, expected_event) == True
+
+def test_parse_reads_with_accept_skips_rejected_reads(
+    multiple_read_test_file, multiple_read_expected):
+    parser = EventalignReadParser()
+    rejected = multiple_read_expected[1]["name"]
+    reads = list(parser.parse_reads(multiple_read_test_file, 
+        lambda name, contig, position: name != rejected))
+    assert [read.name for read in reads] == \
+        [multiple_read_expected[0]["name"], multiple_read_expected[2]["name"]]
@@ -0,0 +1,128 @@
+import h5py
+import numpy as np
+import os
+import pytest
+from eventparser.eventalign import EventalignReadParser
+from eventparser.fast5 import Fast5Index, SignalAttacher
+from eventparser.h5 import CompactH5EventWriter, H5EventReader
+from eventparser.parser import AlignedEventParser
+
+IN="tests/integration/data/eventalign/"
+READ_A = "c1654154-560c-42e4-a8c1-197e9ade83fb"
+READ_B = "8c329395-b3c6-41f2-82a8-b2b78b4c19de"
+READ_C = "fb90c5fa-859e-455a-87d4-cac02fa565e7"
+SIGNAL_LENGTH = 40000
+OFFSET, RANGE, DIGITISATION = 10.0, 1400.0, 8192.0
+
+"""
+Test fixtures
+
+FAST5 files are generated rather than stored, with the signal of each 
+read being its sample index (mod 2^15), so that slices can be checked 
+against event indexes.
+"""
+def raw_signal(length=SIGNAL_LENGTH):
+    return (np.arange(length) % 2 ** 15).astype(np.int16)
+
+def write_channel(group):
+    group.attrs["offset"] = OFFSET
+    group.attrs["range"] = RANGE
+    group.attrs["digitisation"] = DIGITISATION
+    group.attrs["sampling_rate"] = 3012.0
+
+def write_multi_read_fast5(filepath, read_names, length=SIGNAL_LENGTH):
+    with h5py.File(filepath, "w") as fast5:
+        for read_name in read_names:
+            read_group = fast5.create_group("read_" + read_name)
+            read_group.create_group("Raw").create_dataset("Signal", 
+                data=raw_signal(length))
+            read_group["Raw"].attrs["read_id"] = read_name
+            write_channel(read_group.create_group("channel_id"))
+
+def write_single_read_fast5(filepath, read_name):
+    with h5py.File(filepath, "w") as fast5:
+        raw = fast5.create_group("Raw/Reads/Read_1")
+        raw.attrs["read_id"] = read_name.encode()
+        raw.create_dataset("Signal", data=raw_signal())
+        write_channel(fast5.create_group("UniqueGlobalKey/channel_id"))
+
+@pytest.fixture
+def fast5_dir(tmp_path):
+    write_multi_read_fast5(str(tmp_path / "batch_0.fast5"), [READ_A, READ_B])
+    (tmp_path / "single").mkdir()
+    write_single_read_fast5(str(tmp_path / "single" / "read_c.fast5"), READ_C)
+    return str(tmp_path)
+
+def parse_reads():
+    with open("{0}multiple_reads.tsv".format(IN)) as f:
+        return list(EventalignReadParser().parse_reads(f))
+
+def test_fast5_index_with_multi_and_single_read_files(fast5_dir):
+    index = Fast5Index(fast5_dir)
+    assert len(index) == 3
+    assert index.files[READ_A] == index.files[READ_B]
+    assert index.files[READ_C].endswith("read_c.fast5")
+
+def test_attach_with_raw_signal_slices_events(fast5_dir):
+    attacher = SignalAttacher(fast5_dir, scale=False)
+    reads = list(attacher.attach_all(parse_reads()))
+    assert attacher.missing == 0
+    for read in reads:
+        for event in read.events:
+            assert event.signal.tolist() == \
+                list(range(event.start_idx, event.end_idx))
+
+def test_attach_with_scale_converts_to_pA(fast5_dir):
+    attacher = SignalAttacher(fast5_dir)
+    read = attacher.attach_all(parse_reads()).__next__()
+    event = read.events[0]
+    expected = (np.arange(event.start_idx, event.end_idx) + OFFSET) * \
+        RANGE / DIGITISATION
+    assert event.signal.dtype == np.float32
+    assert np.allclose(event.signal, expected)
+    attacher.close()
+
+def test_attach_with_one_open_file_reopens_files(fast5_dir):
+    attacher = SignalAttacher(fast5_dir, scale=False, max_open_files=1)
+    reads = list(attacher.attach_all(parse_reads()))
+    assert all(event.signal is not None 
+        for read in reads for event in read.events)
+
+def test_attach_with_missing_read_leaves_signal_unset(tmp_path):
+    write_multi_read_fast5(str(tmp_path / "batch_0.fast5"), [READ_A])
+    attacher = SignalAttacher(str(tmp_path))
+    reads = list(attacher.attach_all(parse_reads()))
+    assert attacher.missing == 2
+    assert reads[1].events[0].signal is None
+
+def test_attach_with_short_signal_leaves_signal_unset(tmp_path):
+    write_multi_read_fast5(str(tmp_path / "batch_0.fast5"), [READ_A], 
+        length=100)
+    write_multi_read_fast5(str(tmp_path / "batch_1.fast5"), [READ_B, READ_C])
+    attacher = SignalAttacher(str(tmp_path))
+    reads = list(attacher.attach_all(parse_reads()))
+    assert attacher.out_of_range == 1
+    assert attacher.missing == 0
+    assert reads[0].events[0].signal is None
+    assert reads[1].events[0].signal is not None
+
+def test_options_change_when_fast5_file_changes(fast5_dir):
+    attacher = SignalAttacher(fast5_dir)
+    options = attacher.options()
+    assert SignalAttacher(fast5_dir).options() == options
+    filepath = os.path.join(fast5_dir, "batch_0.fast5")
+    write_multi_read_fast5(filepath, [READ_A, READ_B], length=100)
+    resized = attacher.options()
+    assert resized != options
+    stat = os.stat(filepath)
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert attacher.options() != resized
+
+def test_parse_with_signal_attacher_writes_signal(fast5_dir, tmp_path):
+    parser = AlignedEventParser(EventalignReadParser(), CompactH5EventWriter(),
+        signal_attacher=SignalAttacher(fast5_dir, scale=False))
+    out_file = parser.parse("{0}multiple_reads.tsv".format(IN), str(tmp_path))
+    for read in H5EventReader().read_reads(out_file):
+        for event in read.events:
+            assert event.signal.tolist() == \
+                list(range(event.start_idx, event.end_idx))
@@ -1,8 +1,16 @@
 import h5py
 import os
 import pytest
+import subprocess
+import sys
+import threading
+import time
+from eventparser.cache import ConversionCache
+from eventparser.follow import FollowFile
+from eventparser.h5 import CompactH5EventWriter, H5EventReader, H5EventWriter
 from eventparser.eventalign import EventalignReadParser
 from eventparser.parser import AlignedEventParser
+from eventparser.sampling import CoverageSampler
 
 IN="tests/integration/data/eventalign/"
 OUT="tests/integration/data/h5/"
@@ -40,3 +48,162 @@ def test_parse_writes_reads_to_h5_file_with_event_order_preserved():
         for event in read:
             actual_events.append(event)
     assert actual_events == expected_events
+
+def test_parse_with_cache_reuses_unchanged_output(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    parser = AlignedEventParser(EventalignReadParser())
+    out_file = parser.parse("{0}single_read.tsv".format(IN), str(tmp_path), cache)
+    mtime = os.stat(out_file).st_mtime_ns
+    parser.parse("{0}single_read.tsv".format(IN), str(tmp_path), cache)
+    assert cache.misses == 1
+    assert cache.hits == 1
+    assert os.stat(out_file).st_mtime_ns == mtime
+
+def test_parse_with_cache_links_output_to_new_dir(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    parser = AlignedEventParser(EventalignReadParser())
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = parser.parse("{0}single_read.tsv".format(IN), str(tmp_path / "a"), cache)
+    second = parser.parse("{0}single_read.tsv".format(IN), str(tmp_path / "b"), cache)
+    assert cache.hits == 1
+    with h5py.File(second, "r") as h5:
+        assert list(h5.keys()) == ["read-c1654154-560c-42e4-a8c1-197e9ade83fb"]
+    assert os.path.samefile(first, second)
+
+def test_parse_with_cache_and_changed_options_reconverts(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    parser = AlignedEventParser(EventalignReadParser())
+    parser.parse("{0}single_read.tsv".format(IN), str(tmp_path), cache)
+    parser.options = lambda: {"other": True}
+    parser.parse("{0}single_read.tsv".format(IN), str(tmp_path), cache)
+    assert cache.misses == 2
+
+def test_parse_with_features_writes_features_dataset(tmp_path):
+    parser = AlignedEventParser(EventalignReadParser(features=True, 
+        keep_samples=True))
+    out_file = parser.parse("{0}single_read.tsv".format(IN), str(tmp_path))
+    with h5py.File(out_file, "r") as h5:
+        read = h5["read-c1654154-560c-42e4-a8c1-197e9ade83fb"]
+        features = read["features"][()]
+        assert list(features["position"]) [:4] == [1405, 1406, 1407, 1408]
+        assert "samples" in read["event-1405"]
+
+def test_parse_with_compact_writer_reads_back_same_events(tmp_path):
+    (tmp_path / "groups").mkdir()
+    (tmp_path / "compact").mkdir()
+    groups_file = AlignedEventParser(EventalignReadParser(keep_samples=True)
+        ).parse("{0}multiple_reads.tsv".format(IN), str(tmp_path / "groups"))
+    compact_file = AlignedEventParser(EventalignReadParser(keep_samples=True),
+        CompactH5EventWriter()).parse("{0}multiple_reads.tsv".format(IN),
+        str(tmp_path / "compact"))
+    reader = H5EventReader()
+    expected = list(reader.read_reads(groups_file))
+    actual = list(reader.read_reads(compact_file))
+    assert [r.name for r in actual] == [r.name for r in expected]
+    for actual_read, expected_read in zip(actual, expected):
+        assert actual_read.contig == expected_read.contig
+        assert [(e.position, e.ref_kmer.sequence, e.start_idx, e.end_idx, e.samples)
+                for e in actual_read.events] == \
+            [(e.position, e.ref_kmer.sequence, e.start_idx, e.end_idx, e.samples)
+                for e in expected_read.events]
+    assert os.path.getsize(compact_file) < os.path.getsize(groups_file)
+
+@pytest.mark.parametrize("writer", [H5EventWriter, CompactH5EventWriter])
+def test_parse_with_sampler_removes_evicted_reads(tmp_path, writer):
+    # All reads on one contig, so each read may evict the previous one
+    with open("{0}multiple_reads.tsv".format(IN)) as f:
+        lines = f.readlines()
+    in_file = tmp_path / "one_contig.tsv"
+    in_file.write_text(lines[0] + "".join("ENST0\t" + line.split("\t", 1)[1]
+        for line in lines[1:]))
+    kept = set()
+    for seed in range(10):
+        parser = AlignedEventParser(EventalignReadParser(), writer(),
+            CoverageSampler(1, seed=seed))
+        out_file = parser.parse(str(in_file), str(tmp_path))
+        with h5py.File(out_file, "r") as h5:
+            assert len(h5.keys()) == 1
+            kept.update(h5.keys())
+    assert len(kept) > 1
+
+def test_parse_with_follow_writes_reads_as_they_complete(tmp_path):
+    with open("{0}multiple_reads.tsv".format(IN)) as f:
+        lines = f.readlines()
+    filepath = str(tmp_path / "growing.tsv")
+    with open(filepath, "w") as f:
+        f.writelines(lines[:7]) # header, first read and start of second
+    written = []
+    written_before_finish = []
+    class RecordingWriter(H5EventWriter):
+        def write_read(self, read):
+            written.append(read.name)
+            super().write_read(read)
+
+    def follow_up():
+        time.sleep(0.2)
+        written_before_finish.extend(written)
+        with open(filepath, "a") as f:
+            f.writelines(lines[7:])
+        follow.finish()
+
+    follow = FollowFile(filepath, poll_interval=0.01)
+    thread = threading.Thread(target=follow_up)
+    thread.start()
+    parser = AlignedEventParser(EventalignReadParser(), RecordingWriter())
+    out_file = parser.parse(filepath, str(tmp_path), follow=follow)
+    thread.join()
+    # Only the first read was complete, so only it was written early
+    assert written_before_finish == ["c1654154-560c-42e4-a8c1-197e9ade83fb"]
+    # The producer did not exit, so the last read may be incomplete
+    assert len(written) == 2
+    with h5py.File(out_file, "r") as h5:
+        assert len(h5.keys()) == 2
+
+def test_parse_with_follow_and_exited_producer_writes_last_read(tmp_path):
+    producer = subprocess.Popen([sys.executable, "-c", "pass"])
+    producer.wait()
+    follow = FollowFile("{0}multiple_reads.tsv".format(IN), poll_interval=0.01,
+        producer_pid=producer.pid)
+    parser = AlignedEventParser(EventalignReadParser())
+    out_file = parser.parse("{0}multiple_reads.tsv".format(IN), str(tmp_path),
+        follow=follow)
+    with h5py.File(out_file, "r") as h5:
+        assert len(h5.keys()) == 3
+
+def test_parse_with_follow_ending_on_half_written_row(tmp_path):
+    with open("{0}multiple_reads.tsv".format(IN)) as f:
+        lines = f.readlines()
+    filepath = tmp_path / "growing.tsv"
+    half_row = lines[7][:len(lines[7]) // 2]
+    filepath.write_text("".join(lines[:7]) + half_row)
+    follow = FollowFile(str(filepath), poll_interval=0.01)
+    follow.finish()
+    parser = AlignedEventParser(EventalignReadParser())
+    out_file = parser.parse(str(filepath), str(tmp_path), follow=follow)
+    assert follow.dropped_line == half_row
+    with h5py.File(out_file, "r") as h5:
+        assert list(h5.keys()) == ["read-c1654154-560c-42e4-a8c1-197e9ade83fb"]
+
+def test_parse_with_follow_calls_follow_on_idle(tmp_path):
+    idle_calls = []
+    def on_idle():
+        idle_calls.append(True)
+        follow.finish()
+
+    follow = FollowFile("{0}multiple_reads.tsv".format(IN), poll_interval=0.01,
+        on_idle=on_idle)
+    parser = AlignedEventParser(EventalignReadParser())
+    out_file = parser.parse("{0}multiple_reads.tsv".format(IN), str(tmp_path),
+        follow=follow)
+    assert idle_calls == [True]
+    assert follow.on_idle is on_idle
+    with h5py.File(out_file, "r") as h5:
+        assert len(h5.keys()) == 2
+
+def test_parse_with_follow_and_cache_raises_exception(tmp_path):
+    parser = AlignedEventParser(EventalignReadParser())
+    filepath = "{0}single_read.tsv".format(IN)
+    with pytest.raises(ValueError):
+        parser.parse(filepath, str(tmp_path), 
+            ConversionCache(str(tmp_path / "cache")), FollowFile(filepath))
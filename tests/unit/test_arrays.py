@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from eventparser.arrays import GrowableArray, Categories, is_valid_row
+from eventparser.eventalign import Line
+
+def test_growable_array_append_past_capacity():
+    array = GrowableArray(np.int64, capacity=2)
+    for i in range(5):
+        array.append(i)
+    assert len(array) == 5
+    assert array.to_array().tolist() == [0, 1, 2, 3, 4]
+    assert array.to_array().dtype == np.int64
+
+def test_categories_code_with_repeated_values():
+    categories = Categories()
+    codes = [categories.code(v) for v in ["B", "A", "B", "C"]]
+    assert codes == [0, 1, 0, 2]
+    assert categories.values == ["B", "A", "C"]
+
+@pytest.mark.parametrize("row", [
+    (123, "GCACT", "GCACT", 1, 3),
+    (0, "GCACT", "AGTGC", 0, 4),
+    (-1, "GCACT", "GCACT", 1, 3),
+    (123, "ACNTC", "GCACT", 1, 3),
+    (123, "GCACT", "NNNNN", 1, 3),
+    (123, "GCACT", "GCACC", 1, 3),
+    (123, "GCACT", "AGTGC", 4, 4),
+    (123, "GCACT", "AGTGC", -1, 4),
+])
+def test_is_valid_row_matches_line_is_valid(row):
+    position, ref_kmer, model_kmer, start_idx, end_idx = row
+    line = Line("ENST0", position, "read_A", ref_kmer, model_kmer, 
+        start_idx, end_idx)
+    assert is_valid_row(*row) == line.is_valid()
@@ -0,0 +1,47 @@
+import pytest
+from eventparser import cache
+from eventparser.cache import fingerprint, cache_key
+
+@pytest.fixture
+def small_file(tmp_path):
+    path = tmp_path / "small.tsv"
+    path.write_bytes(b"contig\tposition\n" * 100)
+    return str(path)
+
+@pytest.fixture
+def large_file(tmp_path):
+    path = tmp_path / "large.tsv"
+    path.write_bytes(bytes(range(256)) * 8192)
+    return str(path)
+
+def test_fingerprint_with_same_content_is_same(small_file, tmp_path):
+    other = tmp_path / "other.tsv"
+    other.write_bytes(open(small_file, "rb").read())
+    assert fingerprint(small_file) == fingerprint(str(other))
+
+def test_fingerprint_with_changed_content_is_different(small_file):
+    before = fingerprint(small_file)
+    with open(small_file, "r+b") as f:
+        f.seek(50)
+        f.write(b"X")
+    assert fingerprint(small_file) != before
+
+def test_fingerprint_with_large_file_samples_blocks(large_file):
+    before = fingerprint(large_file)
+    with open(large_file, "r+b") as f:
+        f.seek(cache.BLOCK_SIZE + 1) # between the first two sampled blocks
+        f.write(b"X")
+    assert fingerprint(large_file) == before
+    assert fingerprint(large_file, full=True) != \
+        fingerprint(large_file, full=False)
+
+def test_fingerprint_with_large_file_and_full_hash_detects_change(large_file):
+    before = fingerprint(large_file, full=True)
+    with open(large_file, "r+b") as f:
+        f.seek(cache.BLOCK_SIZE + 1)
+        f.write(b"X")
+    assert fingerprint(large_file, full=True) != before
+
+def test_cache_key_with_different_options_is_different(small_file):
+    assert cache_key(small_file, {"writer": "A"}) != \
+        cache_key(small_file, {"writer": "B"})
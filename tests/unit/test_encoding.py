@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from eventparser.encoding import pack_kmers, unpack_kmers, kmer_code_dtype, \
+    int_dtype, delta_encode, delta_decode
+
+def test_pack_kmers_with_valid_kmers():
+    codes = pack_kmers(["AAAAA", "AAAAC", "TTTTT", "CGTAC"])
+    assert codes.tolist() == [0, 1, 1023, 0b0110110001]
+
+def test_pack_kmers_with_invalid_base():
+    with pytest.raises(ValueError):
+        pack_kmers(["AANAA"])
+
+def test_pack_kmers_with_different_lengths():
+    with pytest.raises(ValueError):
+        pack_kmers(["AAAAA", "AAAA"])
+    # Same total length as three 5-mers
+    with pytest.raises(ValueError):
+        pack_kmers(["AAAAA", "AAAAAA", "AAAA"])
+
+def test_unpack_kmers_reverses_pack_kmers():
+    kmers = ["GATTACAGATTACAGATTACAGATTACAGATT", "ACGTACGTACGTACGTACGTACGTACGTACGT"]
+    assert unpack_kmers(pack_kmers(kmers), 32) == kmers
+
+def test_kmer_code_dtype_with_increasing_k():
+    assert kmer_code_dtype(4) == np.uint8
+    assert kmer_code_dtype(5) == np.uint16
+    assert kmer_code_dtype(9) == np.uint32
+    assert kmer_code_dtype(32) == np.uint64
+    with pytest.raises(ValueError):
+        kmer_code_dtype(33)
+
+def test_int_dtype_with_small_values():
+    assert int_dtype([-1, 1, 127]) == np.int8
+    assert int_dtype([0, 255], signed=False) == np.uint8
+    assert int_dtype([-129]) == np.int16
+
+def test_delta_encode_with_monotone_values():
+    first, deltas = delta_encode([17484, 17393, 17379, 17321])
+    assert first == 17484
+    assert deltas.dtype == np.int8
+    assert delta_decode(first, deltas).tolist() == [17484, 17393, 17379, 17321]
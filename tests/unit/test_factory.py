@@ -1,5 +1,10 @@
 import pytest
-from eventparser.factory import AlignedEventParserFactory, AlignedEventType
+import subprocess
+import sys
+from importlib import metadata
+from eventparser import factory
+from eventparser.factory import AlignedEventParserFactory, AlignedEventType, \
+    BackendRegistry
 from eventparser.parser import AlignedEventParser
 from eventparser.eventalign import EventalignReadParser, TomboReadParser
 
@@ -19,3 +24,55 @@ def test_create_with_invalid_event_type():
     factory = AlignedEventParserFactory()
     with pytest.raises(ValueError):
         factory.create("invalid_event_type")
+
+def test_create_with_read_parser_name():
+    factory = AlignedEventParserFactory()
+    parser = factory.create("eventalign")
+    assert isinstance(parser.read_parser, EventalignReadParser)
+
+def test_create_with_hdf5_writer():
+    from eventparser.h5 import H5EventWriter
+    factory = AlignedEventParserFactory()
+    parser = factory.create(AlignedEventType.NANOPOLISH_EVENTALIGN, "hdf5")
+    assert isinstance(parser.writer, H5EventWriter)
+
+def test_create_with_invalid_writer():
+    factory = AlignedEventParserFactory()
+    with pytest.raises(ValueError):
+        factory.create(AlignedEventType.NANOPOLISH_EVENTALIGN, "invalid_writer")
+
+def test_registry_load_with_lazy_target():
+    registry = BackendRegistry("eventparser.test_backends")
+    registry.register("eventalign", "eventparser.eventalign:EventalignReadParser")
+    assert registry.load("eventalign") is EventalignReadParser
+
+def test_registry_load_with_class_target():
+    registry = BackendRegistry("eventparser.test_backends")
+    registry.register("tombo", TomboReadParser)
+    assert registry.load("tombo") is TomboReadParser
+    assert registry.names() == ["tombo"]
+
+def fake_entry_points(group):
+    return [metadata.EntryPoint("mytool", 
+                "eventparser.eventalign:TomboReadParser", group),
+            metadata.EntryPoint("nested", 
+                "eventparser.factory:BackendRegistry.names", group),
+            metadata.EntryPoint("tombo", "eventparser.ont:Read", group)]
+
+def test_registry_load_with_entry_point(monkeypatch):
+    monkeypatch.setattr(factory, "_entry_points", fake_entry_points)
+    registry = BackendRegistry("eventparser.test_backends")
+    registry.register("tombo", TomboReadParser)
+    assert registry.load("mytool") is TomboReadParser
+    assert registry.load("nested") is BackendRegistry.names
+    assert registry.load("tombo") is TomboReadParser
+    assert registry.names() == ["mytool", "nested", "tombo"]
+
+def test_entry_points_with_unknown_group():
+    assert list(factory._entry_points("eventparser.no_such_group")) == []
+
+def test_import_factory_does_not_import_h5py():
+    code = "import sys, eventparser.factory; print('h5py' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+        stdout=subprocess.PIPE, universal_newlines=True)
+    assert out.stdout.strip() == "False"
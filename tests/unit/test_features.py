@@ -0,0 +1,19 @@
+import numpy as np
+from eventparser.features import sample_features
+
+def test_sample_features_with_samples():
+    median, mad = sample_features([[1.0, 2.0, 10.0], [4.0, 1.0]])
+    assert median.tolist() == [2.0, 2.5]
+    assert mad.tolist() == [1.0, 1.5]
+
+def test_sample_features_with_no_samples_is_nan():
+    median, mad = sample_features([[], [3.0]])
+    assert np.isnan(median[0]) and np.isnan(mad[0])
+    assert median[1] == 3.0 and mad[1] == 0.0
+
+def test_sample_features_with_small_batches_is_unchanged():
+    samples = [[float(x) for x in range(n)] for n in (5, 1, 8, 3, 2)]
+    expected = sample_features(samples)
+    actual = sample_features(samples, batch_size=2)
+    assert np.array_equal(actual[0], expected[0])
+    assert np.array_equal(actual[1], expected[1])
@@ -0,0 +1,79 @@
+import subprocess
+import sys
+import threading
+import time
+from eventparser.follow import FollowFile, is_running
+
+def write_later(filepath, chunks, delay=0.05):
+    """Appends each chunk to filepath after a delay, in a thread."""
+    def run():
+        for chunk in chunks:
+            time.sleep(delay)
+            with open(filepath, "a") as f:
+                f.write(chunk)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def test_follow_file_with_done_file_reads_all_lines(tmp_path):
+    filepath = str(tmp_path / "growing.tsv")
+    done_file = str(tmp_path / "growing.done")
+    thread = write_later(filepath, ["a\n", "b\n", "c\n"])
+    lines = []
+    with FollowFile(filepath, poll_interval=0.01, done_file=done_file) as f:
+        for line in f:
+            lines.append(line)
+            if line == "c\n":
+                open(done_file, "w").close()
+    thread.join()
+    assert lines == ["a\n", "b\n", "c\n"]
+
+def test_follow_file_holds_back_partial_line(tmp_path):
+    filepath = str(tmp_path / "growing.tsv")
+    thread = write_later(filepath, ["a\nb", "c\n"])
+    with FollowFile(filepath, poll_interval=0.01, idle_timeout=0.5) as f:
+        lines = list(f)
+    thread.join()
+    assert lines == ["a\n", "bc\n"]
+
+def test_follow_file_drops_partial_line_once_complete(tmp_path):
+    filepath = tmp_path / "complete.tsv"
+    filepath.write_text("a\nb")
+    follow = FollowFile(str(filepath), poll_interval=0.01)
+    follow.finish()
+    assert list(follow) == ["a\n"]
+    assert follow.dropped_line == "b"
+    assert follow.truncated == True
+
+def test_follow_file_with_finish_is_truncated(tmp_path):
+    filepath = tmp_path / "complete.tsv"
+    filepath.write_text("a\n")
+    follow = FollowFile(str(filepath), poll_interval=0.01)
+    follow.finish()
+    assert list(follow) == ["a\n"]
+    assert follow.dropped_line is None
+    assert follow.truncated == True
+
+def test_follow_file_with_exited_producer_stops(tmp_path):
+    filepath = tmp_path / "complete.tsv"
+    filepath.write_text("a\n")
+    producer = subprocess.Popen([sys.executable, "-c", "pass"])
+    producer.wait()
+    with FollowFile(str(filepath), poll_interval=0.01, 
+        producer_pid=producer.pid) as f:
+        assert list(f) == ["a\n"]
+        assert f.truncated == False
+
+def test_follow_file_calls_on_idle_while_waiting(tmp_path):
+    filepath = str(tmp_path / "growing.tsv")
+    idle = []
+    thread = write_later(filepath, ["a\n"], delay=0.1)
+    with FollowFile(filepath, poll_interval=0.01, idle_timeout=0.3,
+        on_idle=lambda: idle.append(True)) as f:
+        assert list(f) == ["a\n"]
+    thread.join()
+    assert len(idle) > 0
+
+def test_is_running_with_current_process():
+    import os
+    assert is_running(os.getpid()) == True
@@ -1,5 +1,5 @@
 import pytest
-from eventparser.ont import Read, Event, Kmer
+from eventparser.ont import Read, Event, EventStatistics, Kmer
 
 def test_read_add_event_with_event():
     read = Read("read123", "ENST0")
@@ -8,10 +8,15 @@ def test_read_add_event_with_event():
     read.add_event(event)
     assert len(read.events) == 1
 
-# def test_event_add_samples_with_samples():
-#     event = Event(1, "ACGT", 1, 3)
-#     event.add_samples([0.3, 0.4])
-#     assert event.samples == [0.1, 0.2, 0.3, 0.4]
+def test_event_add_samples_with_samples():
+    event = Event(1, "ACGT", 1, 3, [0.1, 0.2])
+    event.add_samples([0.3, 0.4])
+    assert event.samples == [0.1, 0.2, 0.3, 0.4]
+
+def test_event_add_samples_before_existing_samples():
+    event = Event(1, "ACGT", 1, 3, [0.3, 0.4])
+    event.add_samples([0.1, 0.2], before=True)
+    assert event.samples == [0.1, 0.2, 0.3, 0.4]
 
 def test_kmer_is_valid_with_valid_sequence():
     kmer = Kmer("ACGTTTCCCCGACAAAATCG")
@@ -53,4 +58,28 @@ def test_kmer_is_reverse_complement_with_non_reverse_complement_kmer():
 def test_kmer_is_reverse_complement_with_invalid_kmer():
     kmer = Kmer("ACGTCA")
     other_kmer = Kmer("ACGTCAN")
-    assert kmer.is_reverse_complement(other_kmer) == False
\ No newline at end of file
+    assert kmer.is_reverse_complement(other_kmer) == False
+
+def test_event_statistics_add_combines_rows():
+    stats = EventStatistics(2, 1.0, 0.0, 0.1, 5.0, 1.0, -1.0)
+    stats.add(2, 3.0, 0.0, 0.2, 1.0)
+    assert stats.n_samples == 4
+    assert stats.level_mean == pytest.approx(2.0)
+    assert stats.level_stdv == pytest.approx(1.0)
+    assert stats.dwell_time == pytest.approx(0.3)
+    assert stats.standardized_level == pytest.approx(0.0)
+
+def test_event_statistics_add_pools_variance():
+    samples = [[1.0, 2.0, 6.0], [4.0, 4.0], [10.0, 0.0, 3.0, 5.0]]
+    def row(s):
+        mean = sum(s) / len(s)
+        stdv = (sum((x - mean) ** 2 for x in s) / len(s)) ** 0.5
+        return len(s), mean, stdv
+    n, mean, stdv = row(samples[0])
+    stats = EventStatistics(n, mean, stdv, 0.0, 0.0, 1.0, 0.0)
+    for s in samples[1:]:
+        n, mean, stdv = row(s)
+        stats.add(n, mean, stdv, 0.0, 0.0)
+    _, expected_mean, expected_stdv = row(sum(samples, []))
+    assert stats.level_mean == pytest.approx(expected_mean)
+    assert stats.level_stdv == pytest.approx(expected_stdv)
@@ -0,0 +1,107 @@
+import weakref
+import pytest
+from eventparser.ont import Read
+from eventparser.sampling import CoverageSampler
+
+class FakeReadParser:
+    """Yields a Read per (name, contig, position) tuple, skipping those
+    rejected by accept, and records which reads were parsed.
+    """
+    def __init__(self, reads):
+        self.reads = reads
+        self.parsed = []
+
+    def parse_reads(self, in_file, accept=None):
+        for name, contig, position in self.reads:
+            if accept is None or accept(name, contig, position):
+                self.parsed.append(name)
+                yield Read(name, contig)
+
+class LookaheadReadParser(FakeReadParser):
+    """Like FakeReadParser, but decides on every read before parsing
+    any of them.
+    """
+    def parse_reads(self, in_file, accept=None):
+        accepted = [(name, contig) for name, contig, position in self.reads
+            if accept is None or accept(name, contig, position)]
+        for name, contig in accepted:
+            self.parsed.append(name)
+            yield Read(name, contig)
+
+def sample(sampler, parser):
+    """Returns the reads finally kept by sampler, as a writer would."""
+    kept = {}
+    for read in sampler.sample(parser, None, kept.pop):
+        kept[read.name] = read
+    return list(kept.values())
+
+def make_reads(n, contig="ENST0", position=0):
+    return [("{0}-{1}".format(contig, i), contig, position) for i in range(n)]
+
+def test_sample_keeps_at_most_max_reads_per_contig():
+    parser = FakeReadParser(make_reads(100, "ENST0") + make_reads(3, "ENST1"))
+    reads = sample(CoverageSampler(10), parser)
+    assert len([r for r in reads if r.contig == "ENST0"]) == 10
+    assert len([r for r in reads if r.contig == "ENST1"]) == 3
+
+def test_sample_with_same_seed_keeps_same_reads():
+    reads = make_reads(1000)
+    first = [r.name for r in sample(CoverageSampler(5, seed=1), FakeReadParser(reads))]
+    second = [r.name for r in sample(CoverageSampler(5, seed=1), FakeReadParser(reads))]
+    third = [r.name for r in sample(CoverageSampler(5, seed=2), FakeReadParser(reads))]
+    assert first == second
+    assert first != third
+
+def test_sample_yields_reads_in_input_order():
+    reads = make_reads(1000)
+    names = [r.name for r in sample(CoverageSampler(20), FakeReadParser(reads))]
+    order = [name for name, _, _ in reads]
+    assert names == sorted(names, key=order.index)
+
+def test_sample_keeps_at_most_max_reads_at_any_time():
+    kept = set()
+    for read in CoverageSampler(10).sample(FakeReadParser(make_reads(1000)),
+            None, kept.remove):
+        kept.add(read.name)
+        assert len(kept) <= 10
+    assert len(kept) == 10
+
+def test_sample_does_not_hold_yielded_reads():
+    refs = []
+    for read in CoverageSampler(10).sample(FakeReadParser(make_reads(1000)),
+            None, lambda name: None):
+        assert all(ref() is None for ref in refs)
+        refs.append(weakref.ref(read))
+
+def test_sample_drops_reads_evicted_before_parsing():
+    reads = make_reads(1000)
+    evicted = []
+    lookahead = [r.name for r in CoverageSampler(5).sample(
+        LookaheadReadParser(reads), None, evicted.append)]
+    assert evicted == []
+    assert lookahead == [r.name for r in
+        sample(CoverageSampler(5), FakeReadParser(reads))]
+
+def test_sample_does_not_parse_most_rejected_reads():
+    parser = FakeReadParser(make_reads(10000))
+    sample(CoverageSampler(10), parser)
+    assert len(parser.parsed) < 200
+
+def test_sample_with_window_caps_each_window():
+    reads = make_reads(50, position=5) + \
+        [("late-{0}".format(i), "ENST0", 150) for i in range(50)]
+    kept = sample(CoverageSampler(4, window=100), FakeReadParser(reads))
+    assert len(kept) == 8
+
+def test_sample_is_uniform():
+    counts = [0] * 10
+    for seed in range(2000):
+        for read in sample(CoverageSampler(2, seed=seed),
+                FakeReadParser(make_reads(10))):
+            counts[int(read.name.split("-")[1])] += 1
+    # Each read is kept with probability 2/10
+    assert all(abs(count - 400) < 80 for count in counts)
+
+def test_coverage_sampler_with_invalid_max_reads():
+    with pytest.raises(ValueError):
+        CoverageSampler(0)